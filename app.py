@@ -1,95 +1,319 @@
 import streamlit as st
 import pandas as pd
+import altair as alt
 import numpy as np
+import os
 import time
 import re
-from io import BytesIO
-
-def format_rupiah(x):
-    if pd.isna(x):
-        return ""
-    # pastikan bisa diubah ke float
-    try:
-        x = float(x)
-    except:
-        return x  # biarin apa adanya kalau bukan angka
-
-    # kalau tidak punya desimal (misal 7000.0), tampilkan tanpa ,00
-    if x.is_integer():
-        formatted = f"{int(x):,}".replace(",", ".")
-    else:
-        formatted = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-        # hapus ,00 kalau desimalnya 0 semua (misal 7000,00 → 7000)
-        if formatted.endswith(",00"):
-            formatted = formatted[:-3]
-    return formatted
-
-def highlight_total(row):
-    if any(str(x).strip().upper() == "TOTAL" for x in row):
-        return ["font-weight: bold; background-color: #D9EAD3; color: #1A5E20;"] * len(row)
-    else:
-        return [""] * len(row)
-    
-def highlight_bold(row):
-    if any(str(x).strip().upper() == "TOTAL" for x in row):
-        return ["font-weight: bold;"] * len(row)
-    else:
-        return [""] * len(row)
-    
-# Highlight total per year
-def highlight_total_per_year(row):
-    if str(row["SCOPE"]).strip().upper() == "TOTAL" and pd.notna(row["YEAR"]):
-        return ["font-weight: bold; background-color: #FFEB9C; color: #9C6500;"] * len(row)
-    else:
-        return [""] * len(row)
+import threading
+
+import instrumentation
+import tender_cache
+from excel_export import (
+    EXPORT_STREAM_MIN_CELLS,
+    build_sheet_plan,
+    dataframe_fingerprint,
+    export_cell_count,
+    generate_multi_sheet_excel,
+    stream_multi_sheet_excel,
+)
+from instrumentation import perf_stage
+from pipeline import (
+    INGEST_WORKERS,
+    ROW_KIND_COL,
+    average_gap_summary,
+    build_bid_analysis,
+    build_tco_cube,
+    drop_row_kind,
+    melt_cost_summary,
+    merge_vendor_workbook,
+    tco_summary,
+    win_rate_summary,
+)
+from table_style import (
+    clamp_page,
+    filter_rows,
+    page_count,
+    rupiah_formatters,
+    sort_rows,
+    style_table,
+)
+
+# Instrumentasi opt-in (env TCO_PERF=1): record stage dikumpulkan ulang tiap rerun
+instrumentation.reset()
+
+# ================= GUIDE CACHE =================
+# Tabel contoh, dummy dataset dan semua hasil turunannya dibangun sekali per
+# proses server (st.cache_resource) dan dipakai bersama oleh semua session.
+# Objek yang di-cache hanya dibaca, tidak pernah diubah di script.
+def red_highlight(row):
+    styles = [""] * len(row)
 
-# Highlight vendor total
-def highlight_vendor_total(row):
-    if str(row["YEAR"]).strip().upper() == "TOTAL":
-        return ["font-weight: bold; background-color: #C6EFCE; color: #006100;"] * len(row)
+    # Highlight ROW "TOTAL"
+    if row["Scope"] == "TOTAL":
+        styles = ["color: #FF4D4D;" for _ in row]
     else:
-        return [""] * len(row)
-    
-def highlight_rank_summary(row, num_cols):
-    styles = [""] * len(row)
+        # Highlight COLUMN "TOTAL"
+        total_col_index = row.index.get_loc("TOTAL")
+        styles[total_col_index] = "color: #FF4D4D;"
 
-    # Ambil nilai numeric vendor
-    numeric_vals = row[num_cols]
+    return styles
 
-    # EXCLUDE nilai 0 (vendor tidak ikut tender)
-    numeric_vals = numeric_vals[numeric_vals != 0]
+@st.cache_resource(show_spinner=False)
+def build_example_tables():
+    """Tabel contoh statis di bagian Input File Structure & Constraint."""
+    tables = {}
 
-    # Skip jika kosong / NaN semua
-    if numeric_vals.dropna().empty:
-        return styles
+    columns = ["Year", "Scope", "Desc", "Region 1", "Region 2", "Region 3", "Region 4", "Region 5"]
+    tables["structure"] = pd.DataFrame([[""] * len(columns) for _ in range(3)], columns=columns)
 
-    # Sort numeric values
-    sorted_vals = numeric_vals.sort_values()
+    columns = ["No", "Year", "Scope", "Desc", "Region 1", "Region 2", "Region 3", "Region 4", "Region 5"]
+    data = [
+        [1] + [""] * (len(columns) - 1),
+        [2] + [""] * (len(columns) - 1),
+        [3] + [""] * (len(columns) - 1)
+    ]
+    tables["number_column"] = pd.DataFrame(data, columns=columns)
 
-    # Determine 1st & 2nd rank
-    first_vendor = sorted_vals.index[0]
-    second_vendor = sorted_vals.index[1] if len(sorted_vals) > 1 else None
+    columns = ["", "A", "B", "C", "D", "E", "F", "G"]
 
-    # Apply styles
-    for i, col in enumerate(row.index):
-        if col == first_vendor:
-            styles[i] = "background-color: #C6EFCE; color: #006100;"
-        elif second_vendor and col == second_vendor:
-            styles[i] = "background-color: #FFEB9C; color: #9C6500;"
+    # Buat 5 baris kosong
+    df = pd.DataFrame([[""] * len(columns) for _ in range(7)], columns=columns)
 
-    return styles
+    # Isi kolom pertama dengan 1–7
+    df.iloc[:, 0] = [1, 2, 3, 4, 5, 6, 7]
 
-def highlight_1st_2nd(row, columns):
-    styles = [""] * len(columns)
-    first_vendor = row.get("1st Vendor")
-    second_vendor = row.get("2nd Vendor")
+    # Header bagian kedua
+    df.loc[1, ["B", "C", "D", "E", "F"]] = ["Year", "Scope", "Region 1", "Region 2", "Region 3"]
 
-    for i, col in enumerate(columns):
-        if col == first_vendor:
-            styles[i] = "background-color: #C6EFCE; color: #006100;"
-        elif col == second_vendor:
-            styles[i] = "background-color: #FFEB9C; color: #9C6500;"
-    return styles
+    # Data Software & Hardware
+    df.loc[2, ["B", "C", "D", "E", "F"]] = ["2025", "AirCon Dismantle", "1.000", "2.000", "3.000"]
+    df.loc[3, ["B", "C", "D", "E", "F"]] = ["2025", "ACPBD Dismantle", "5.500", "6.500", "7.500"]
+    df.loc[4, ["B", "C", "D", "E", "F"]] = ["2026", "AirCon Dismantle", "1.200", "1.900", "3.100"]
+    df.loc[5, ["B", "C", "D", "E", "F"]] = ["2026", "ACPBD Dismantle", "5.300", "6.700", "7.300"]
+    tables["floating_table"] = df
+
+    columns = ["Year", "Scope", "Region 1", "Region 2", "Region 3", "TOTAL"]
+    data = [
+        ["2025", "AirCon Dismantle", "1.000", "2.000", "3.000", "6.000"],
+        ["2025", "ACPBD Dismantle", "5.500", "6.500", "7.500", "19.500"],
+        ["2025", "TOTAL", "6.500", "8.500", "10.500", "25.500"],
+    ]
+    df = pd.DataFrame(data, columns=columns)
+    tables["total_row"] = df
+    # CSS red_highlight dihitung sekali; Styler-nya dibuat per rerun (murah)
+    tables["total_row_css"] = df.apply(red_highlight, axis=1, result_type="broadcast")
+    return tables
+
+@st.cache_resource(show_spinner=False)
+def load_file_bytes(path, mtime):
+    """Isi file (binary); mtime ikut jadi key supaya cache ikut berubah kalau file diganti."""
+    with open(path, "rb") as f:
+        return f.read()
+
+# Paling banyak sekian workbook yang block vendor-nya disimpan sekaligus
+VENDOR_BLOCK_WORKBOOKS = 8
+
+@st.cache_resource(show_spinner=False, max_entries=VENDOR_BLOCK_WORKBOOKS)
+def vendor_block_cache(path):
+    """
+    Cache block per vendor untuk merge_vendor_workbook, satu per workbook (path)
+    supaya upload workbook lain tidak mengusir block workbook ini. Lock dipegang
+    selama merge: dict-nya dipakai bersama oleh semua session.
+    """
+    return threading.Lock(), {}
+
+def merge_with_block_cache(path):
+    """Merge Data dari workbook `path`; hanya sheet yang berubah sejak merge terakhir di-parse ulang."""
+    lock, blocks = vendor_block_cache(path)
+    with lock:
+        return merge_vendor_workbook(path, workers=INGEST_WORKERS, cache=blocks)
+
+def styled_table(df, formatters, css, na_rep=None):
+    """Styler dari formatter + CSS yang sudah di-cache, tanpa menghitung ulang style_table."""
+    return df.style.format(formatters, na_rep=na_rep).apply(lambda _: css, axis=None)
+
+# ================= TABLE VIEW =================
+# Tabel di atas batas ini ditampilkan per halaman: Styler (CSS per cell) hanya
+# dibuat untuk baris yang terlihat, bukan seluruh tabel
+TABLE_PAGE_ROWS = 1_000
+PAGE_SIZES = [100, 250, 500, 1_000]
+FILTER_COLS = ["VENDOR", "YEAR", "REGION", "SCOPE"]
+ORIGINAL_ORDER = "(original order)"
+
+def table_entry(df, formatters, na_rep=None, **style):
+    """
+    Data tampilan satu tabel: DataFrame (dengan kolom ROW_KIND, untuk export &
+    paging), versi tampilannya (tanpa ROW_KIND), formatter, argumen style_table
+    dan CSS. CSS penuh hanya dihitung untuk tabel kecil; tabel besar di-style per
+    halaman.
+    """
+    small = len(df) <= TABLE_PAGE_ROWS
+    return {
+        "df": df,
+        "view": drop_row_kind(df) if small else None,
+        "formatters": formatters,
+        "na_rep": na_rep,
+        "style": style,
+        "css": style_table(df, **style) if small else None,
+    }
+
+def paged_table(name, entry):
+    """
+    Tampilan per halaman untuk tabel besar. Filter (VENDOR / YEAR / REGION / SCOPE)
+    dan sort dijalankan di server; hanya baris di halaman aktif yang di-style dan
+    dikirim ke browser. Highlight TOTAL & 1st/2nd dihitung per baris (row_kind +
+    ranking per baris), jadi hasilnya sama dengan men-style seluruh tabel.
+    """
+    df = entry["df"]
+    filters = {}
+
+    filter_cols = [c for c in FILTER_COLS if c in df.columns]
+    for col, box in zip(filter_cols, st.columns(len(filter_cols))):
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            options = values.cat.categories.tolist()
+        else:
+            options = pd.unique(values.dropna()).tolist()
+        filters[col] = box.multiselect(col, options, key=f"{name}:filter:{col}")
+
+    sort_box, desc_box, size_box, page_box = st.columns([3, 2, 2, 2])
+    sort_col = sort_box.selectbox("Sort by", [ORIGINAL_ORDER, *[c for c in df.columns if c != ROW_KIND_COL]], key=f"{name}:sort")
+    descending = desc_box.toggle("Descending", key=f"{name}:desc")
+    page_size = size_box.selectbox("Rows per page", PAGE_SIZES, key=f"{name}:size")
+
+    rows = sort_rows(
+        df, filter_rows(df, filters), None if sort_col == ORIGINAL_ORDER else sort_col, descending
+    )
+
+    n_pages = page_count(len(rows), page_size)
+    page_key = f"{name}:page"
+    # Filter baru bisa membuat jumlah halaman berkurang
+    page = st.session_state.get(page_key, 1)
+    if clamp_page(page, len(rows), page_size) != page:
+        st.session_state[page_key] = clamp_page(page, len(rows), page_size)
+    page = page_box.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    window = rows[start:start + page_size]
+    # Kolom ROW_KIND ikut ter-slice bersama barisnya
+    view = df.iloc[window]
+    css = style_table(view, **entry["style"])
+    st.dataframe(
+        styled_table(drop_row_kind(view), entry["formatters"], css, na_rep=entry["na_rep"]), hide_index=True
+    )
+    st.caption(
+        f"Rows {min(start + 1, len(rows)):,}–{start + len(window):,} of {len(rows):,}"
+        + (f" (filtered from {len(df):,})" if len(rows) < len(df) else "")
+    )
+
+def show_table(name, entry):
+    """
+    Tampilkan satu tabel hasil (Styler). Tabel kecil langsung dengan CSS yang sudah
+    di-cache; tabel besar lewat paged_table. Render diukur sebagai stage "styler:<name>".
+    """
+    df = entry["df"]
+    with perf_stage(f"styler:{name}", rows=len(df)):
+        if entry["css"] is None:
+            paged_table(name, entry)
+        else:
+            styler = styled_table(entry["view"], entry["formatters"], entry["css"], na_rep=entry["na_rep"])
+            st.dataframe(styler, hide_index=True)
+
+@st.cache_resource(show_spinner=False)
+def build_guide_tables(path, mtime):
+    """
+    Semua hasil contoh dari dummy dataset: Merge Data, Cost Summary, TCO Summary,
+    Bid & Price Analysis (beserta formatter + CSS untuk Styler-nya) dan spec chart
+    VISUALIZATION. Dihitung ulang hanya kalau file dummy berubah.
+    """
+    guide = {}
+
+    # File yang sama (hash isi) dibaca dari cache Arrow di disk tanpa parse Excel;
+    # kalau belum ada, block per vendor di-cache: sheet yang tidak berubah tidak di-parse ulang
+    df_merge = tender_cache.cached_merge(
+        load_file_bytes(path, mtime),
+        lambda: merge_with_block_cache(path),
+    )
+    num_cols = ["REGION 1", "REGION 2", "TOTAL"]
+    guide["merge"] = table_entry(
+        df_merge, rupiah_formatters(df_merge, num_cols), total_per_year=True, vendor_total=True
+    )
+
+    # COST SUMMARY = transpose region dari Merge Data
+    df_summary = melt_cost_summary(df_merge)
+    guide["summary"] = table_entry(
+        df_summary, rupiah_formatters(df_summary, ["PRICE"]), total_per_year=True, vendor_total=True
+    )
+
+    # Cube vendor × year × region × scope, dibangun sekali untuk ketiga tab
+    tco_cube = build_tco_cube(df_summary)
+    vendor_cols = tco_cube["vendor"]
+    for by in ["YEAR", "REGION", "SCOPE"]:
+        df_tco = tco_summary(tco_cube, by)
+        guide[f"tco_{by.lower()}"] = table_entry(
+            df_tco, rupiah_formatters(df_tco, vendor_cols), bold_total=True, rank_cols=vendor_cols
+        )
+
+    # BID & PRICE ANALYSIS (dihitung dari cube TCO)
+    df_analysis = build_bid_analysis(tco_cube)
+    num_cols = vendor_cols + ["1st Lowest", "2nd Lowest", "Median Price"]
+    format_dic = rupiah_formatters(df_analysis, num_cols)
+    format_dic.update({"Gap 1 to 2 (%)": "{:.1f}%"})
+
+    for v in vendor_cols:
+        format_dic[f"{v} to Median (%)"] = "{:+.1f}%"
+
+    guide["analysis"] = table_entry(df_analysis, format_dic, na_rep="", rank_by_vendor=True)
+
+    # VISUALIZATION: chart cuma menerima hasil agregasi (vendor x rank), bukan
+    # baris analysis mentah. Spec Vega-Lite disimpan langsung, jadi validasi
+    # schema Altair juga tidak diulang di setiap rerun.
+    df_win_rate = win_rate_summary(df_analysis, vendor_cols)
+    df_avg_gap, gap_benchmark = average_gap_summary(df_analysis, vendor_cols)
+
+    win_rate_base = alt.Chart(df_win_rate, title="Vendor Win Rate Comparison (1st vs 2nd Place)").encode(
+        x=alt.X("VENDOR:N", sort=vendor_cols, title=None),
+        y=alt.Y("WIN RATE (%):Q", title="Win Rate (%)"),
+        color=alt.Color(
+            "RANK:N", title="Rank",
+            scale=alt.Scale(range=["#1F3BFF", "#FFA41B"]),
+            legend=alt.Legend(orient="bottom"),
+        ),
+    )
+    win_rate_chart = (
+        win_rate_base.mark_line(point=alt.OverlayMarkDef(size=120), strokeWidth=3)
+        + win_rate_base.mark_text(dy=-12, fontWeight="bold").encode(
+            text=alt.Text("WIN RATE (%):Q", format=".1f")
+        )
+    )
+
+    avg_gap_base = alt.Chart(df_avg_gap, title="Average Gap (%) per 1st Vendor").encode(
+        x=alt.X("VENDOR:N", sort=vendor_cols, title=None),
+        y=alt.Y("AVG GAP (%):Q", title="Average Gap (%)"),
+    )
+    avg_gap_chart = (
+        avg_gap_base.mark_bar().encode(
+            color=alt.Color(
+                "VENDOR:N", sort=vendor_cols, legend=None,
+                scale=alt.Scale(range=["#F0712C", "#FF3333", "#FFA41B"]),
+            )
+        )
+        + avg_gap_base.mark_text(dy=-8, fontWeight="bold").encode(
+            text=alt.Text("AVG GAP (%):Q", format=".1f")
+        )
+    )
+    if pd.notna(gap_benchmark):
+        avg_gap_chart += alt.Chart(pd.DataFrame({"BENCHMARK": [gap_benchmark]})).mark_rule(
+            color="#A6A6A6", strokeDash=[6, 4], strokeWidth=2
+        ).encode(y="BENCHMARK:Q")
+
+    guide["win_rate_chart"] = win_rate_chart.to_dict()
+    guide["avg_gap_chart"] = avg_gap_chart.to_dict()
+    guide["gap_benchmark"] = gap_benchmark
+    return guide
+
+example_tables = build_example_tables()
 
 st.markdown(
     """
@@ -148,10 +372,7 @@ st.markdown(
 )
 
 # Dataframe
-columns = ["Year", "Scope", "Desc", "Region 1", "Region 2", "Region 3", "Region 4", "Region 5"]
-df = pd.DataFrame([[""] * len(columns) for _ in range(3)], columns=columns)
-
-st.dataframe(df, hide_index=True)
+st.dataframe(example_tables["structure"], hide_index=True)
 
 # Buat DataFrame 1 row
 st.markdown("""
@@ -255,15 +476,7 @@ st.markdown(
 )
 
 # DataFrame
-columns = ["No", "Year", "Scope", "Desc", "Region 1", "Region 2", "Region 3", "Region 4", "Region 5"]
-data = [
-    [1] + [""] * (len(columns) - 1),
-    [2] + [""] * (len(columns) - 1),
-    [3] + [""] * (len(columns) - 1)
-]
-df = pd.DataFrame(data, columns=columns)
-
-st.dataframe(df, hide_index=True)
+st.dataframe(example_tables["number_column"], hide_index=True)
 
 st.markdown(
     """
@@ -294,24 +507,7 @@ st.markdown(
 )
 
 # DataFrame
-columns = ["", "A", "B", "C", "D", "E", "F", "G"]
-
-# Buat 5 baris kosong
-df = pd.DataFrame([[""] * len(columns) for _ in range(7)], columns=columns)
-
-# Isi kolom pertama dengan 1–7
-df.iloc[:, 0] = [1, 2, 3, 4, 5, 6, 7]
-
-# Header bagian kedua
-df.loc[1, ["B", "C", "D", "E", "F"]] = ["Year", "Scope", "Region 1", "Region 2", "Region 3"]
-
-# Data Software & Hardware
-df.loc[2, ["B", "C", "D", "E", "F"]] = ["2025", "AirCon Dismantle", "1.000", "2.000", "3.000"]
-df.loc[3, ["B", "C", "D", "E", "F"]] = ["2025", "ACPBD Dismantle", "5.500", "6.500", "7.500"]
-df.loc[4, ["B", "C", "D", "E", "F"]] = ["2026", "AirCon Dismantle", "1.200", "1.900", "3.100"]
-df.loc[5, ["B", "C", "D", "E", "F"]] = ["2026", "ACPBD Dismantle", "5.300", "6.700", "7.300"]
-
-st.dataframe(df, hide_index=True)
+st.dataframe(example_tables["floating_table"], hide_index=True)
 
 st.markdown(
     """
@@ -336,29 +532,8 @@ st.markdown(
 )
 
 # DataFrame
-columns = ["Year", "Scope", "Region 1", "Region 2", "Region 3", "TOTAL"]
-data = [
-    ["2025", "AirCon Dismantle", "1.000", "2.000", "3.000", "6.000"],
-    ["2025", "ACPBD Dismantle", "5.500", "6.500", "7.500", "19.500"],
-    ["2025", "TOTAL", "6.500", "8.500", "10.500", "25.500"],
-]
-df = pd.DataFrame(data, columns=columns)
-
-def red_highlight(row):
-    styles = [""] * len(row)
-
-    # Highlight ROW "TOTAL"
-    if row["Scope"] == "TOTAL":
-        styles = ["color: #FF4D4D;" for _ in row]
-    else:
-        # Highlight COLUMN "TOTAL"
-        total_col_index = row.index.get_loc("TOTAL")
-        styles[total_col_index] = "color: #FF4D4D;"
-
-    return styles
-
-num_cols = ["Y0", "Y1", "Y2", "Y3", "TOTAL 3Y TCO"]
-df_styled = df.style.apply(red_highlight, axis=1)
+df = example_tables["total_row"]
+df_styled = df.style.apply(lambda _: example_tables["total_row_css"], axis=None)
 
 st.dataframe(df_styled, hide_index=True)
 
@@ -383,9 +558,10 @@ st.markdown("#### What is Displayed?")
 # Path file Excel yang sudah ada
 file_path = "dummy dataset.xlsx"
 
-# Buka file sebagai binary
-with open(file_path, "rb") as f:
-    file_data = f.read()
+# Buka file sebagai binary (di-cache lintas session) + semua hasil contohnya
+file_mtime = os.path.getmtime(file_path)
+file_data = load_file_bytes(file_path, file_mtime)
+guide = build_guide_tables(file_path, file_mtime)
 
 # Markdown teks
 st.markdown(
@@ -433,56 +609,29 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# DataFrame
-columns = ["VENDOR", "YEAR", "SCOPE", "REGION 1", "REGION 2", "TOTAL"]
-data = [
-    ["Vendor A", "2025", "Site Survey", 8500, 9000, 17500],
-    ["Vendor A", "2025", "DG Dismantle", 45000, 47800, 92800],
-    ["Vendor A", "2025", "RAN & Power Supply", 68000, 65500, 133500],
-    ["Vendor A", "2025", "TOTAL", 121500, 122300, 243800],
-
-    ["Vendor A", "2026", "Site Survey", 9200, 8800, 18000],
-    ["Vendor A", "2026", "DG Dismantle", 46500, 44000, 90500],
-    ["Vendor A", "2026", "RAN & Power Supply", 74900, 72400, 147300],
-    ["Vendor A", "2026", "TOTAL", 130600, 125200, 255800],
-
-    ["Vendor A", "TOTAL", "", 252100, 247500, 499600],
+# DataFrame (hasil MERGE DATA dari dummy dataset)
+df_merge = guide["merge"]["df"]
 
-    ["Vendor B", "2025", "Site Survey", 8200, 8700, 16900],
-    ["Vendor B", "2025", "DG Dismantle", 46200, 49000, 95200],
-    ["Vendor B", "2025", "RAN & Power Supply", 70500, 67900, 138400],
-    ["Vendor B", "2025", "TOTAL", 124900, 125600, 250500],
+show_table("Merge Data", guide["merge"])
 
-    ["Vendor B", "2026", "Site Survey", 8700, 8300, 17000],
-    ["Vendor B", "2026", "DG Dismantle", 48900, 46800, 95700],
-    ["Vendor B", "2026", "RAN & Power Supply", 71900, 69300, 141200],
-    ["Vendor B", "2026", "TOTAL", 129500, 124400, 253900],
-
-    ["Vendor B", "TOTAL", "", 254400, 250000, 504400],
-
-    ["Vendor C", "2025", "Site Survey", 8900, 9200, 18100],
-    ["Vendor C", "2025", "DG Dismantle", 43500, 46000, 89500],
-    ["Vendor C", "2025", "RAN & Power Supply", 73800, 71500, 145300],
-    ["Vendor C", "2025", "TOTAL", 126200, 126700, 252900],
-
-    ["Vendor C", "2026", "Site Survey", 9700, 9300, 19000],
-    ["Vendor C", "2026", "DG Dismantle", 51300, 49100, 100400],
-    ["Vendor C", "2026", "RAN & Power Supply", 69500, 66800, 136300],
-    ["Vendor C", "2026", "TOTAL", 130500, 125200, 255700],
-
-    ["Vendor C", "TOTAL", "", 256700, 251900, 508600],
-]
-df_merge = pd.DataFrame(data, columns=columns)
-
-num_cols = ["REGION 1", "REGION 2", "TOTAL"]
-df_merge_styled = (
-    df_merge.style
-    .format({col: format_rupiah for col in num_cols})
-    .apply(highlight_total_per_year, axis=1)
-    .apply(highlight_vendor_total, axis=1)
-)
+# Posisi floating table yang terdeteksi di tiap sheet
+table_ranges = df_merge.attrs.get("table_ranges", {})
+if table_ranges:
+    st.caption(
+        "Table detected at: "
+        + " · ".join(f"**{vendor}** {cell_range}" for vendor, cell_range in table_ranges.items())
+    )
 
-st.dataframe(df_merge_styled, hide_index=True)
+# Cell harga yang bukan angka (misal "N/A") dibaca sebagai kosong, tunjukkan lokasinya
+invalid_cells = df_merge.attrs.get("invalid_cells", {})
+if invalid_cells:
+    st.warning(
+        "Non-numeric prices were read as empty: "
+        + " · ".join(
+            f"**{vendor}** " + ", ".join(f"{cell} ({value!r})" for cell, value in cells.items())
+            for vendor, cells in invalid_cells.items()
+        )
+    )
 
 st.write("")
 st.markdown("**:orange-badge[2. COST SUMMARY]**")
@@ -497,92 +646,10 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# DataFrame
-columns = ["VENDOR", "YEAR", "REGION", "SCOPE", "PRICE"]
-data = [
-    ["Vendor A", "2025", "REGION 1", "Site Survey", 8500],
-    ["Vendor A", "2025", "REGION 1", "DG Dismantle", 45000],
-    ["Vendor A", "2025", "REGION 1", "RAN & Power Supply", 68000],
-    ["Vendor A", "2025", "REGION 1", "TOTAL", 121500],
-
-    ["Vendor A", "2026", "REGION 1", "Site Survey", 9200],
-    ["Vendor A", "2026", "REGION 1", "DG Dismantle", 46500],
-    ["Vendor A", "2026", "REGION 1", "RAN & Power Supply", 74900],
-    ["Vendor A", "2026", "REGION 1", "TOTAL", 130600],
-
-    ["Vendor A", "TOTAL", "REGION 1", "", 252100],
-
-    ["Vendor B", "2025", "REGION 1", "Site Survey", 8200],
-    ["Vendor B", "2025", "REGION 1", "DG Dismantle", 46200],
-    ["Vendor B", "2025", "REGION 1", "RAN & Power Supply", 70500],
-    ["Vendor B", "2025", "REGION 1", "TOTAL", 124900],
-
-    ["Vendor B", "2026", "REGION 1", "Site Survey", 8700],
-    ["Vendor B", "2026", "REGION 1", "DG Dismantle", 48900],
-    ["Vendor B", "2026", "REGION 1", "RAN & Power Supply", 71900],
-    ["Vendor B", "2026", "REGION 1", "TOTAL", 129500],
-
-    ["Vendor B", "TOTAL", "REGION 1", "", 254400],
-
-    ["Vendor C", "2025", "REGION 1", "Site Survey", 8900],
-    ["Vendor C", "2025", "REGION 1", "DG Dismantle", 43500],
-    ["Vendor C", "2025", "REGION 1", "RAN & Power Supply", 73800],
-    ["Vendor C", "2025", "REGION 1", "TOTAL", 126200],
+# DataFrame (COST SUMMARY = transpose region dari Merge Data)
+df_summary = guide["summary"]["df"]
 
-    ["Vendor C", "2026", "REGION 1", "Site Survey", 9700],
-    ["Vendor C", "2026", "REGION 1", "DG Dismantle", 51300],
-    ["Vendor C", "2026", "REGION 1", "RAN & Power Supply", 69500],
-    ["Vendor C", "2026", "REGION 1", "TOTAL", 130500],
-
-    ["Vendor C", "TOTAL", "REGION 1", "", 256700],
-
-    ["Vendor A", "2025", "REGION 2", "Site Survey", 9000],
-    ["Vendor A", "2025", "REGION 2", "DG Dismantle", 47800],
-    ["Vendor A", "2025", "REGION 2", "RAN & Power Supply", 65500],
-    ["Vendor A", "2025", "REGION 2", "TOTAL", 122300],
-
-    ["Vendor A", "2026", "REGION 2", "Site Survey", 8800],
-    ["Vendor A", "2026", "REGION 2", "DG Dismantle", 44000],
-    ["Vendor A", "2026", "REGION 2", "RAN & Power Supply", 72400],
-    ["Vendor A", "2026", "REGION 2", "TOTAL", 125200],
-
-    ["Vendor A", "TOTAL", "REGION 2", "", 247500],
-
-    ["Vendor B", "2025", "REGION 2", "Site Survey", 8700],
-    ["Vendor B", "2025", "REGION 2", "DG Dismantle", 49000],
-    ["Vendor B", "2025", "REGION 2", "RAN & Power Supply", 67900],
-    ["Vendor B", "2025", "REGION 2", "TOTAL", 125600],
-
-    ["Vendor B", "2026", "REGION 2", "Site Survey", 8300],
-    ["Vendor B", "2026", "REGION 2", "DG Dismantle", 46800],
-    ["Vendor B", "2026", "REGION 2", "RAN & Power Supply", 69300],
-    ["Vendor B", "2026", "REGION 2", "TOTAL", 124400],
-
-    ["Vendor B", "TOTAL", "REGION 2", "", 250000],
-
-    ["Vendor C", "2025", "REGION 2", "Site Survey", 9200],
-    ["Vendor C", "2025", "REGION 2", "DG Dismantle", 46000],
-    ["Vendor C", "2025", "REGION 2", "RAN & Power Supply", 71500],
-    ["Vendor C", "2025", "REGION 2", "TOTAL", 126700],
-
-    ["Vendor C", "2026", "REGION 2", "Site Survey", 9300],
-    ["Vendor C", "2026", "REGION 2", "DG Dismantle", 49100],
-    ["Vendor C", "2026", "REGION 2", "RAN & Power Supply", 66800],
-    ["Vendor C", "2026", "REGION 2", "TOTAL", 125200],
-
-    ["Vendor C", "TOTAL", "REGION 2", "", 251900],
-]
-df_summary = pd.DataFrame(data, columns=columns)
-
-num_cols = ["PRICE"]
-df_summary_styled = (
-    df_summary.style
-    .format({col: format_rupiah for col in num_cols})
-    .apply(highlight_total_per_year, axis=1)
-    .apply(highlight_vendor_total, axis=1)
-)
-
-st.dataframe(df_summary_styled, hide_index=True)
+show_table("Cost Summary", guide["summary"])
 
 st.write("")
 st.markdown("**:yellow-badge[3. TCO SUMMARY]**")
@@ -611,22 +678,8 @@ with tab1:
     )
 
     # DataFrame
-    columns = ["YEAR", "VENDOR A", "VENDOR B", "VENDOR C"]
-    data = [
-        ["2025", 243800, 250500, 252900],
-        ["2026", 255800, 253900, 255700],
-        ["TOTAL", 499600, 504400, 508600]
-    ]
-    df_tco_year = pd.DataFrame(data, columns=columns)
-
-    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-    df_tco_year_styled = (
-        df_tco_year.style
-        .format({col: format_rupiah for col in num_cols})
-        .apply(highlight_bold, axis=1)
-        .apply(lambda row: highlight_rank_summary(row, num_cols), axis=1)
-    )
-    st.dataframe(df_tco_year_styled, hide_index=True)
+    df_tco_year = guide["tco_year"]["df"]
+    show_table("TCO Summary (Year)", guide["tco_year"])
 
 with tab2:
     st.markdown(
@@ -641,22 +694,8 @@ with tab2:
     )
         
     # DataFrame
-    columns = ["REGION", "VENDOR A", "VENDOR B", "VENDOR C"]
-    data = [
-        ["REGION 1", 252100, 254400, 256700],
-        ["REGION 2", 247500, 250000, 251900],
-        ["TOTAL", 499600, 504400, 508600]
-    ]
-    df_tco_region = pd.DataFrame(data, columns=columns)
-
-    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-    df_tco_region_styled = (
-        df_tco_region.style
-        .format({col: format_rupiah for col in num_cols})
-        .apply(highlight_bold, axis=1)
-        .apply(lambda row: highlight_rank_summary(row, num_cols), axis=1)
-    )
-    st.dataframe(df_tco_region_styled, hide_index=True)
+    df_tco_region = guide["tco_region"]["df"]
+    show_table("TCO Summary (Region)", guide["tco_region"])
 
 with tab3:
     st.markdown(
@@ -671,23 +710,8 @@ with tab3:
     )
 
     # DataFrame
-    columns = ["SCOPE", "VENDOR A", "VENDOR B", "VENDOR C"]
-    data = [
-        ["DG Dismantle", 183300, 190900, 189900],
-        ["RAN & Power Supply", 280800, 279600, 281600],
-        ["Site Survey", 35500, 33900, 37100],
-        ["TOTAL", 499600, 504400, 508600]
-    ]
-    df_tco_scope = pd.DataFrame(data, columns=columns)
-
-    num_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-    df_tco_scope_styled = (
-        df_tco_scope.style
-        .format({col: format_rupiah for col in num_cols})
-        .apply(highlight_bold, axis=1)
-        .apply(lambda row: highlight_rank_summary(row, num_cols), axis=1)
-    )
-    st.dataframe(df_tco_scope_styled, hide_index=True)
+    df_tco_scope = guide["tco_scope"]["df"]
+    show_table("TCO Summary (Scope)", guide["tco_scope"])
 
 st.write("")
 st.markdown("**:green-badge[4. BID & PRICE ANALYSIS]**")
@@ -712,39 +736,10 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# DataFrame
-columns = ["YEAR", "REGION", "SCOPE", "VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "1st Vendor", "2nd Lowest", "2nd Vendor", "Gap 1 to 2 (%)", "Median Price", "VENDOR A to Median (%)", "VENDOR B to Median (%)", "VENDOR C to Median (%)"]
-data = [
-    ["2025","REGION 1","DG Dismantle",45000,46200,43500,43500,"VENDOR C",45000,"VENDOR A", 3.5, 45000, 0, 2.7, -3.3],
-    ["2025","REGION 1","RAN & Power Supply",68000,70500,73800,68000,"VENDOR A",70500,"VENDOR B", 3.7, 70500, -3.5, 0, 4.7],
-    ["2025","REGION 1","Site Survey",8500,8200,8900,8200,"VENDOR B",8500,"VENDOR A", 3.7, 8500, 0, -3.5, 4.7],
-    ["2025","REGION 2","DG Dismantle",47800,49000,46000,46000,"VENDOR C",47800,"VENDOR A", 3.9, 47800, 0, 2.5, -3.8],
-    ["2025","REGION 2","RAN & Power Supply",65500,67900,71500,65500,"VENDOR A",67900,"VENDOR B", 3.7, 67900, -3.5, 0, 5.3],
-    ["2025","REGION 2","Site Survey",9000,8700,9200,8700,"VENDOR B",9000,"VENDOR A", 3.5, 9000, 0, -3.3, 2.2],
-    ["2026","REGION 1","DG Dismantle",46500,48900,51300,46500,"VENDOR A",48900,"VENDOR B", 5.2, 48900, -4.9, 0, 4.9],
-    ["2026","REGION 1","RAN & Power Supply",74900,71900,69500,69500,"VENDOR C",71900,"VENDOR B", 3.5, 71900, 4.2, 0, -3.3],
-    ["2026","REGION 1","Site Survey",9200,8700,9700,8700,"VENDOR B",9200,"VENDOR A", 5.8, 9200, 0, -5.4, 5.4],
-    ["2026","REGION 2","DG Dismantle",44000,46800,49100,44000,"VENDOR A",46800,"VENDOR B", 6.4, 46800, -6, 0, 4.9],
-    ["2026","REGION 2","RAN & Power Supply",72400,69300,66800,66800,"VENDOR C",69300,"VENDOR B", 3.7, 69300, 4.5, 0, -3.6],
-    ["2026","REGION 2","Site Survey",8800,8300,9300,8300,"VENDOR B",8800,"VENDOR A", 6, 8800, 0, -5.7, 5.7],
-]
-df_analysis = pd.DataFrame(data, columns=columns)
-
-num_cols = ["VENDOR A", "VENDOR B", "VENDOR C", "1st Lowest", "2nd Lowest", "Median Price"]
-format_dic = {col: format_rupiah for col in num_cols}
-format_dic.update({"Gap 1 to 2 (%)": "{:.1f}%"})
-
-vendor_cols = ["VENDOR A", "VENDOR B", "VENDOR C"]
-for v in vendor_cols:
-    format_dic[f"{v} to Median (%)"] = "{:+.1f}%"
-
-df_analysis_styled = (
-    df_analysis.style
-    .format(format_dic)
-    .apply(lambda row: highlight_1st_2nd(row, df_analysis.columns), axis=1)
-)
-
-st.dataframe(df_analysis_styled, hide_index=True)
+# DataFrame (dihitung dari cube TCO)
+df_analysis = guide["analysis"]["df"]
+
+show_table("Bid & Price Analysis", guide["analysis"])
 
 st.write("")
 st.markdown("**:blue-badge[5. VISUALIZATION]**")
@@ -763,7 +758,7 @@ st.markdown(
 tab1, tab2 = st.tabs(["Win Rate Trend", "Average Gap Trend"])
 
 with tab1:
-    st.image("assets/1.png")
+    st.vega_lite_chart(spec=guide["win_rate_chart"], use_container_width=True)
     with st.expander("See explanation"):
         st.caption('''
             The visualization above compares the win rate of each vendor
@@ -781,7 +776,7 @@ with tab1:
         ''')
 
 with tab2:
-    st.image("assets/2.png")
+    st.vega_lite_chart(spec=guide["avg_gap_chart"], use_container_width=True)
     with st.expander("See explanation"):
         st.caption('''
             The chart above shows the average price difference between 
@@ -795,8 +790,8 @@ with tab2:
             - Low Gap  
                 Low gap indicates intense competition with similar pricing among vendors.  
             
-            The dashed line represents the average gap across all vendors, serving as a benchmark (4.4%).
-        ''')
+            The dashed line represents the average gap across all vendors, serving as a benchmark ({gap_benchmark:.1f}%).
+        '''.format(gap_benchmark=guide["gap_benchmark"]))
     
 st.write("")
 st.markdown("**:violet-badge[6. SUPER BUTTON]**")
@@ -829,139 +824,35 @@ selected_sheets = st.multiselect(
     default=list(dataframes.keys())  # default semua dipilih
 )
 
-# Fungsi "Super Button" & Formatting
-def generate_multi_sheet_excel(selected_sheets, df_dict):
-    output = BytesIO()
-
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        for sheet in selected_sheets:
-            df = df_dict[sheet]
-            df.to_excel(writer, index=False, sheet_name=sheet)
-
-            workbook  = writer.book
-            worksheet = writer.sheets[sheet]
-
-            # ================= FORMAT =================
-            fmt_rp   = workbook.add_format({'num_format': '#,##0'})
-            fmt_pct  = workbook.add_format({'num_format': '#,##0.0"%"'})
-            fmt_bold = workbook.add_format({'bold': True, 'num_format': '#,##0'})
-
-            # Merge / Cost Summary
-            fmt_total_year = workbook.add_format({
-                'bold': True, 'bg_color': '#FFEB9C', 'font_color': '#9C6500', 'num_format': '#,##0'
-            })
-            fmt_total_vendor = workbook.add_format({
-                'bold': True, 'bg_color': '#C6EFCE', 'font_color': '#006100', 'num_format': '#,##0'
-            })
-
-            # Ranking
-            fmt_1  = workbook.add_format({'bg_color': '#C6EFCE', 'num_format': '#,##0'})
-            fmt_2  = workbook.add_format({'bg_color': '#FFEB9C', 'num_format': '#,##0'})
-            fmt_1b = workbook.add_format({'bg_color': '#C6EFCE', 'bold': True, 'num_format': '#,##0'})
-            fmt_2b = workbook.add_format({'bg_color': '#FFEB9C', 'bold': True, 'num_format': '#,##0'})
-
-            num_cols = df.select_dtypes(include=["number"]).columns.tolist()
-            pct_cols = [c for c in df.columns if "%" in c]
-
-            # Cost Summary dynamic column
-            year_col  = next((c for c in df.columns if "YEAR" in c.upper()), None)
-            scope_col = next((c for c in df.columns if "SCOPE" in c.upper()), None)
-            year_idx  = df.columns.get_loc(year_col) if year_col else None
-            scope_idx = df.columns.get_loc(scope_col) if scope_col else None
-
-            # ================= LOOP ROW =================
-            for r, (_, row) in enumerate(df.iterrows(), start=1):
-
-                is_total = any(str(x).strip().upper() == "TOTAL" for x in row)
-                row_fmt = None
-                first = second = None
-
-                # ---------- MERGE DATA ----------
-                if sheet == "Merge Data":
-                    year_val  = str(row.iloc[1]).strip().upper()
-                    scope_val = str(row.iloc[2]).strip().upper()
-
-                    if scope_val == "TOTAL" and year_val != "TOTAL":
-                        row_fmt = fmt_total_year
-                    elif year_val == "TOTAL":
-                        row_fmt = fmt_total_vendor
-
-                # ---------- COST SUMMARY ----------
-                elif sheet == "Cost Summary":
-                    year_val  = str(row.iloc[year_idx]).strip().upper() if year_idx is not None else ""
-                    scope_val = str(row.iloc[scope_idx]).strip().upper() if scope_idx is not None else ""
-
-                    if scope_val == "TOTAL" and year_val != "TOTAL":
-                        row_fmt = fmt_total_year
-                    elif year_val == "TOTAL":
-                        row_fmt = fmt_total_vendor
-
-                # ---------- TCO SUMMARY ----------
-                elif sheet in ["TCO Summary (Year)", "TCO Summary (Region)", "TCO Summary (Scope)"]:
-                    numeric_vals = row[num_cols]
-                    numeric_vals = numeric_vals[(numeric_vals.notna()) & (numeric_vals != 0)]
-
-                    if not numeric_vals.empty:
-                        sorted_vals = numeric_vals.sort_values()
-                        first = sorted_vals.index[0]
-                        if len(sorted_vals) > 1:
-                            second = sorted_vals.index[1]
-
-                # ---------- BID & PRICE ----------
-                elif sheet == "Bid & Price Analysis":
-                    first = row.get("1st Vendor")
-                    second = row.get("2nd Vendor")
-
-                # ================= WRITE CELL =================
-                for c, col in enumerate(df.columns):
-                    val = row[col]
-
-                    if pd.isna(val) or (isinstance(val, (int, float)) and np.isinf(val)):
-                        worksheet.write(r, c, "")
-                        continue
-
-                    fmt = None
-                    is_zero = isinstance(val, (int, float)) and val == 0
-
-                    # --- ranking highlight ---
-                    if sheet in ["TCO Summary (Year)", "TCO Summary (Region)", "TCO Summary (Scope)"] and not is_zero:
-                        if col == first:
-                            fmt = fmt_1b if is_total else fmt_1
-                        elif col == second:
-                            fmt = fmt_2b if is_total else fmt_2
-
-                    # --- Bid & Price ---
-                    elif sheet == "Bid & Price Analysis":
-                        if col == first:
-                            fmt = fmt_1
-                        elif col == second:
-                            fmt = fmt_2
-
-                    # --- TOTAL text ---
-                    if is_total and fmt is None and row_fmt is None:
-                        fmt = fmt_bold
-
-                    # --- WRITE ---
-                    if col in pct_cols:
-                        worksheet.write_number(r, c, val, fmt or fmt_pct)
-                    elif col in num_cols:
-                        worksheet.write_number(r, c, val, fmt or (row_fmt or fmt_rp))
-                    else:
-                        worksheet.write(r, c, val, row_fmt or fmt)
-
-            # ================= AUTOFIT =================
-            for i, col in enumerate(df.columns):
-                worksheet.set_column(
-                    i, i,
-                    max(len(str(col)), df[col].astype(str).map(len).max()) + 2
-                )
-
-    output.seek(0)
-    return output.getvalue()
+# ================= SUPER BUTTON CACHE =================
+# Argumen berawalan "_" tidak di-hash Streamlit, key-nya cukup sheet + fingerprint
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_sheet_plan(sheet, fingerprint, _df):
+    return build_sheet_plan(sheet, _df)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_multi_sheet_excel(selected_sheets, fingerprints, _df_dict):
+    fingerprints = dict(fingerprints)
+    return generate_multi_sheet_excel(
+        list(selected_sheets), _df_dict, plan=lambda sheet, df: cached_sheet_plan(sheet, fingerprints[sheet], df)
+    )
+
+def cached_multi_sheet_excel(selected_sheets, df_dict):
+    """
+    Versi memoized dari generate_multi_sheet_excel.
+    Workbook di-cache per (urutan sheet, fingerprint data); plan tiap sheet
+    di-cache terpisah, jadi ganti urutan sheet tidak menghitung ulang semua sheet.
+    """
+    fingerprints = tuple((sheet, dataframe_fingerprint(df_dict[sheet])) for sheet in selected_sheets)
+    return _cached_multi_sheet_excel(tuple(selected_sheets), fingerprints, df_dict)
 
 # ---- DOWNLOAD BUTTON ----
 if selected_sheets:
-    excel_bytes = generate_multi_sheet_excel(selected_sheets, dataframes)
+    # Workbook baru dibuat saat tombol diklik (callable), bukan di setiap rerun
+    def excel_bytes():
+        if export_cell_count(selected_sheets, dataframes) >= EXPORT_STREAM_MIN_CELLS:
+            return stream_multi_sheet_excel(selected_sheets, dataframes)
+        return cached_multi_sheet_excel(selected_sheets, dataframes)
 
     st.download_button(
         label="Download",
@@ -987,4 +878,22 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-st.video("https://youtu.be/kyH0xOaqyMQ?si=eZcQvdkcfmO5fuqB")
\ No newline at end of file
+st.video("https://youtu.be/kyH0xOaqyMQ?si=eZcQvdkcfmO5fuqB")
+
+# ================= PERFORMANCE =================
+if instrumentation.is_enabled():
+    with st.expander("Performance"):
+        perf = pd.DataFrame(instrumentation.records())
+        if perf.empty:
+            st.caption("No pipeline stage ran in this rerun (all results served from cache).")
+        else:
+            # Stage bersarang ditampilkan menjorok sesuai kedalamannya
+            perf["stage"] = ["\u2003" * d + name for d, name in zip(perf["depth"], perf["stage"])]
+            st.dataframe(
+                perf[["stage", "rows", "seconds", "peak_mib"]].rename(columns={"peak_mib": "peak (MiB)"}),
+                hide_index=True,
+            )
+            st.caption(
+                "Export runs when the Super Button is clicked, so it only appears in the logs. "
+                "Timings include tracemalloc overhead."
+            )
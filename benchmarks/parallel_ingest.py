@@ -0,0 +1,96 @@
+"""
+Benchmark parsing sheet vendor: serial vs ProcessPoolExecutor.
+
+Jalankan dari root repo:
+    python -m benchmarks.parallel_ingest --vendors 50 --workers 4
+
+Pool di app opt-in lewat env TCO_INGEST_WORKERS (default 1 = serial); pakai
+benchmark ini untuk memilih nilainya di host yang dipakai.
+
+Selain waktu pool yang sebenarnya, benchmark juga mengukur komponen waktu
+paralel secara terpisah (start pool, chunk worker paling lambat, pickle hasil
+balik ke parent). Di host 1 core waktu pool sebenarnya pasti lebih lambat,
+tapi estimasi critical path tetap menunjukkan speedup yang bisa didapat
+kalau tiap worker dapat core sendiri.
+"""
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+from openpyxl import load_workbook
+
+from benchmarks.synthetic import make_vendor_workbook
+from pipeline import INGEST_WORKERS, _parse_sheet_chunk, _pool_context, load_vendor_sheets
+
+def _timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _pool_startup(workers):
+    # Start process + satu task kosong per worker, dengan start method yang sama seperti pipeline
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        list(pool.map(int, range(workers)))
+
+def critical_path(data, workers, repeat):
+    """
+    Estimasi waktu paralel kalau tiap worker dapat core sendiri: start pool +
+    chunk paling lambat (diukur in-process, satu per satu) + unpickle hasil di parent.
+    """
+    wb = load_workbook(BytesIO(data), read_only=True)
+    names = wb.sheetnames
+    wb.close()
+    chunks = [list(c) for c in np.array_split(np.array(names, dtype=object), workers)]
+
+    startup = _timed(lambda: _pool_startup(workers), repeat)
+    chunk_times, results = [], []
+    for chunk in chunks:
+        chunk_times.append(_timed(lambda: _parse_sheet_chunk(data, chunk), repeat))
+        results.append(_parse_sheet_chunk(data, chunk))
+    # Worker kirim balik hasil lewat pickle, parent unpickle satu per satu
+    payloads = [pickle.dumps(r, protocol=pickle.HIGHEST_PROTOCOL) for r in results]
+    transfer = _timed(lambda: [pickle.loads(p) for p in payloads], repeat)
+    return {
+        "startup": startup,
+        "slowest_chunk": max(chunk_times),
+        "transfer": transfer,
+        "total": startup + max(chunk_times) + transfer,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vendors", type=int, default=50)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--regions", type=int, default=40)
+    parser.add_argument("--scopes", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=max(INGEST_WORKERS, 4))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_vendor_workbook(args.vendors, args.years, args.regions, args.scopes)
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    print(f"workbook: {args.vendors} sheets, {len(data) / 1e6:.1f} MB, {cores} core(s) available")
+
+    serial = _timed(lambda: load_vendor_sheets(data, workers=1), args.repeat)
+    parallel = _timed(lambda: load_vendor_sheets(data, workers=args.workers), args.repeat)
+    estimate = critical_path(data, args.workers, args.repeat)
+
+    print(f"serial               : {serial:.2f} s")
+    print(f"parallel ({args.workers:>2} w)      : {parallel:.2f} s  (speedup {serial / parallel:.2f}x)")
+    print(
+        f"critical path ({args.workers:>2} w) : {estimate['total']:.2f} s  (speedup {serial / estimate['total']:.2f}x)"
+        f"  = startup {estimate['startup']:.2f} + slowest chunk {estimate['slowest_chunk']:.2f}"
+        f" + transfer {estimate['transfer']:.2f}"
+    )
+    if cores < args.workers:
+        print(f"note: only {cores} core(s) here, the measured pool time is CPU-bound; see critical path")
+
+if __name__ == "__main__":
+    main()
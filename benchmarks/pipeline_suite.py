@@ -0,0 +1,220 @@
+"""
+Benchmark per stage pipeline TCO + export Super Button, hasilnya report JSON.
+
+Jalankan dari root repo:
+    python -m benchmarks.pipeline_suite --vendors 10 --scopes 200 --output bench.json
+    python -m benchmarks.pipeline_suite --compare bench.json   # bandingkan dengan report lama
+
+Stage: ingestion (parse sheet), merge, melt (Cost Summary), tco, analysis,
+styler (CSS + render seperti st.dataframe) dan export (generate_multi_sheet_excel).
+Waktu = best of --repeat, peak memory = tracemalloc di run terpisah.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from benchmarks.synthetic import make_vendor_workbook
+from excel_export import generate_multi_sheet_excel
+from pipeline import (
+    build_bid_analysis,
+    build_merge_table,
+    build_tco_cube,
+    drop_row_kind,
+    load_vendor_sheets,
+    melt_cost_summary,
+    tco_summary,
+)
+from table_style import rupiah_formatters, style_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _timed(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def _peak_mib(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def build_stages(data):
+    """
+    Daftar (nama, fungsi) berurutan. Tiap fungsi menerima dict `state` berisi
+    hasil stage sebelumnya, dan return (hasil, jumlah baris yang diproses).
+    """
+    def ingestion(state):
+        sheets = load_vendor_sheets(data, workers=1)
+        return sheets, sum(len(df) for _, df in sheets)
+
+    def merge(state):
+        detail = pd.concat(
+            [df.assign(VENDOR=vendor)[["VENDOR", *df.columns]] for vendor, df in state["ingestion"]],
+            ignore_index=True,
+        )
+        df_merge = build_merge_table(detail)
+        return df_merge, len(df_merge)
+
+    def melt(state):
+        df_summary = melt_cost_summary(state["merge"])
+        return df_summary, len(df_summary)
+
+    def tco(state):
+        cube = build_tco_cube(state["melt"])
+        tables = {by: tco_summary(cube, by) for by in ["YEAR", "REGION", "SCOPE"]}
+        return (cube, tables), sum(len(t) for t in tables.values())
+
+    def analysis(state):
+        df_analysis = build_bid_analysis(state["tco"][0])
+        return df_analysis, len(df_analysis)
+
+    def styler(state):
+        # Sama seperti tampilan guide: formatter rupiah + matrix CSS, lalu
+        # _compute/_translate (langkah yang dijalankan st.dataframe untuk Styler)
+        cube, tables = state["tco"]
+        vendors = cube["vendor"]
+        merge_view = drop_row_kind(state["merge"])
+        num_cols = [c for c in merge_view.columns if pd.api.types.is_numeric_dtype(merge_view[c])]
+        jobs = [
+            (state["merge"], num_cols, {"total_per_year": True, "vendor_total": True}),
+            (state["melt"], ["PRICE"], {"total_per_year": True, "vendor_total": True}),
+            *[(t, vendors, {"bold_total": True, "rank_cols": vendors}) for t in tables.values()],
+            (state["analysis"], vendors + ["1st Lowest", "2nd Lowest", "Median Price"], {"rank_by_vendor": True}),
+        ]
+        rows = 0
+        for df, cols, style in jobs:
+            # CSS dihitung dari frame lengkap (ROW_KIND), Styler dari versi tampilannya
+            css = style_table(df, **style)
+            view = drop_row_kind(df)
+            styled = view.style.format(rupiah_formatters(view, cols), na_rep="").apply(
+                lambda _: css, axis=None
+            )
+            styled._compute()
+            styled._translate(False, False)
+            rows += len(df)
+        return None, rows
+
+    def export(state):
+        _, tables = state["tco"]
+        dataframes = {
+            "Merge Data": state["merge"],
+            "Cost Summary": state["melt"],
+            "TCO Summary (Year)": tables["YEAR"],
+            "TCO Summary (Region)": tables["REGION"],
+            "TCO Summary (Scope)": tables["SCOPE"],
+            "Bid & Price Analysis": state["analysis"],
+        }
+        output = generate_multi_sheet_excel(list(dataframes), dataframes)
+        return len(output), sum(len(df) for df in dataframes.values())
+
+    return [
+        ("ingestion", ingestion),
+        ("merge", merge),
+        ("melt", melt),
+        ("tco", tco),
+        ("analysis", analysis),
+        ("styler", styler),
+        ("export", export),
+    ]
+
+def run_suite(data, repeat=3, memory=True):
+    # Instrumentasi app (TCO_PERF=1) ikut memakai tracemalloc & reset_peak,
+    # jadi dimatikan supaya tidak mengganggu waktu dan peak memory suite ini
+    instrumentation.enable(False)
+    state, report = {}, {}
+    for name, stage in build_stages(data):
+        seconds, (result, rows) = _timed(lambda: stage(state), repeat)
+        entry = {"seconds": round(seconds, 6), "rows": int(rows)}
+        if memory:
+            entry["peak_mib"] = round(_peak_mib(lambda: stage(state)), 3)
+        if name == "export":
+            entry["bytes"] = int(result)
+        state[name] = result
+        report[name] = entry
+    return report
+
+def compare(report, baseline):
+    """Cetak rasio waktu & memory report sekarang terhadap report lama (>1 = lebih lambat)."""
+    print(f"{'stage':<10} {'seconds':>10} {'base':>10} {'ratio':>7} {'peak MiB':>10} {'base':>10}")
+    for name, entry in report["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        ratio = entry["seconds"] / base["seconds"] if base["seconds"] else float("nan")
+        print(
+            f"{name:<10} {entry['seconds']:>10.4f} {base['seconds']:>10.4f} {ratio:>6.2f}x"
+            f" {entry.get('peak_mib', float('nan')):>10.1f} {base.get('peak_mib', float('nan')):>10.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vendors", type=int, default=10)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--regions", type=int, default=10)
+    parser.add_argument("--scopes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="lewati pengukuran tracemalloc")
+    parser.add_argument("--output", help="path report JSON (default: stdout)")
+    parser.add_argument("--compare", help="report JSON lama untuk dibandingkan")
+    args = parser.parse_args()
+
+    data = make_vendor_workbook(args.vendors, args.years, args.regions, args.scopes, seed=args.seed)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "params": {
+                "vendors": args.vendors,
+                "years": args.years,
+                "regions": args.regions,
+                "scopes": args.scopes,
+                "seed": args.seed,
+                "repeat": args.repeat,
+            },
+            "workbook_bytes": len(data),
+        },
+        "stages": run_suite(data, repeat=args.repeat, memory=not args.no_memory),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Generator workbook sintetis dengan struktur sama seperti "dummy dataset.xlsx":
+satu sheet per vendor, floating table mulai dari B2, kolom YEAR → SCOPE → REGION.
+"""
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+def make_vendor_frame(n_years, n_regions, n_scopes, rng, start_year=2025):
+    years = np.repeat([str(start_year + y) for y in range(n_years)], n_scopes)
+    scopes = np.tile([f"Scope {s + 1}" for s in range(n_scopes)], n_years)
+    prices = rng.integers(1_000, 100_000, size=(n_years * n_scopes, n_regions)) * 100
+
+    df = pd.DataFrame(prices, columns=[f"REGION {r + 1}" for r in range(n_regions)])
+    df.insert(0, "SCOPE", scopes)
+    df.insert(0, "YEAR", years)
+    return df
+
+def make_vendor_workbook(n_vendors=3, n_years=2, n_regions=2, n_scopes=3, seed=0, path=None):
+    """Tulis workbook vendor ke `path` (atau BytesIO) dan return path / bytes-nya."""
+    rng = np.random.default_rng(seed)
+    target = path or BytesIO()
+
+    with pd.ExcelWriter(target, engine="xlsxwriter") as writer:
+        for v in range(n_vendors):
+            df = make_vendor_frame(n_years, n_regions, n_scopes, rng)
+            df.to_excel(writer, sheet_name=f"VENDOR {v + 1}", index=False, startrow=1, startcol=1)
+
+    return path if path else target.getvalue()
@@ -0,0 +1,287 @@
+"""
+Engine export Super Button: satu workbook Excel (xlsxwriter) berisi beberapa
+tabel hasil pipeline, lengkap dengan format rupiah / persen, highlight TOTAL
+& 1st/2nd dan autofit kolom. Tidak bergantung pada Streamlit; cache-nya ada
+di app.py.
+"""
+import hashlib
+import tempfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import perf_stage
+from pipeline import (
+    ROW_DETAIL,
+    ROW_VENDOR_TOTAL,
+    ROW_YEAR_TOTAL,
+    drop_row_kind,
+    rank_two_lowest,
+    row_kind,
+)
+
+TCO_SHEETS = ["TCO Summary (Year)", "TCO Summary (Region)", "TCO Summary (Scope)"]
+
+# Kode format per cell (indeks ke EXPORT_FORMATS / list `formats` per workbook)
+FMT_SKIP = -1  # NaN / inf → cell dibiarkan kosong
+(FMT_NONE, FMT_RP, FMT_PCT, FMT_BOLD, FMT_TOTAL_YEAR, FMT_TOTAL_VENDOR,
+ FMT_1, FMT_2, FMT_1B, FMT_2B) = range(10)
+
+# ================= FORMAT REGISTRY =================
+# Satu definisi per format; urutan harus sama dengan konstanta FMT_*
+EXPORT_FORMATS = [
+    None,                                                   # FMT_NONE
+    {'num_format': '#,##0'},                                # FMT_RP
+    {'num_format': '#,##0.0"%"'},                           # FMT_PCT
+    {'bold': True, 'num_format': '#,##0'},                  # FMT_BOLD
+    # Merge / Cost Summary
+    {'bold': True, 'bg_color': '#FFEB9C', 'font_color': '#9C6500', 'num_format': '#,##0'},  # FMT_TOTAL_YEAR
+    {'bold': True, 'bg_color': '#C6EFCE', 'font_color': '#006100', 'num_format': '#,##0'},  # FMT_TOTAL_VENDOR
+    # Ranking
+    {'bg_color': '#C6EFCE', 'num_format': '#,##0'},               # FMT_1
+    {'bg_color': '#FFEB9C', 'num_format': '#,##0'},               # FMT_2
+    {'bg_color': '#C6EFCE', 'bold': True, 'num_format': '#,##0'}, # FMT_1B
+    {'bg_color': '#FFEB9C', 'bold': True, 'num_format': '#,##0'}, # FMT_2B
+]
+
+def build_workbook_formats(workbook):
+    """Buat setiap format export sekali untuk satu workbook (indeks = kode FMT_*)."""
+    return [workbook.add_format(spec) if spec else None for spec in EXPORT_FORMATS]
+
+def build_format_codes(sheet, df):
+    """
+    Hitung matrix kode format (n_row x n_col) untuk satu sheet Super Button.
+    Hasilnya identik dengan logika per-cell lama, tapi dihitung per kolom.
+    Kolom matrix = kolom yang ditulis ke sheet (tanpa ROW_KIND).
+    """
+    kind = row_kind(df)
+    is_total = kind != ROW_DETAIL
+    df = drop_row_kind(df)
+    n_rows = len(df)
+    columns = list(df.columns)
+    num_cols = df.select_dtypes(include=["number"]).columns.tolist()
+    is_num = np.array([c in num_cols for c in columns], dtype=bool)
+    is_pct = np.array(["%" in c for c in columns], dtype=bool)
+
+    # ---------- ROW FORMAT (Merge / Cost Summary) ----------
+    row_code = np.full(n_rows, FMT_NONE, dtype=np.int8)
+    if sheet in ["Merge Data", "Cost Summary"]:
+        row_code[kind == ROW_YEAR_TOTAL] = FMT_TOTAL_YEAR
+        row_code[kind == ROW_VENDOR_TOTAL] = FMT_TOTAL_VENDOR
+
+    # ---------- RANKING (1 = 1st, 2 = 2nd) ----------
+    rank = np.zeros((n_rows, len(columns)), dtype=np.int8)
+    if sheet in TCO_SHEETS and num_cols and n_rows:
+        first, second, _, _ = rank_two_lowest(df[num_cols].to_numpy(dtype=float))
+        num_pos = np.array([columns.index(c) for c in num_cols])
+        rows = np.arange(n_rows)
+        has_1st, has_2nd = first >= 0, second >= 0
+        rank[rows[has_1st], num_pos[first[has_1st]]] = 1
+        rank[rows[has_2nd], num_pos[second[has_2nd]]] = 2
+
+    elif sheet == "Bid & Price Analysis":
+        first  = df["1st Vendor"] if "1st Vendor" in df.columns else pd.Series([None] * n_rows)
+        second = df["2nd Vendor"] if "2nd Vendor" in df.columns else pd.Series([None] * n_rows)
+        first, second = first.to_numpy(), second.to_numpy()
+        for c, col in enumerate(columns):
+            is_first = first == col
+            rank[is_first, c] = 1
+            rank[~is_first & (second == col), c] = 2
+
+    # ---------- CELL FORMAT ----------
+    total_2d = is_total[:, None]
+    if sheet in TCO_SHEETS:
+        fmt = np.where(rank == 1, np.where(total_2d, FMT_1B, FMT_1),
+              np.where(rank == 2, np.where(total_2d, FMT_2B, FMT_2), FMT_NONE))
+    else:
+        fmt = np.where(rank == 1, FMT_1, np.where(rank == 2, FMT_2, FMT_NONE))
+
+    # TOTAL text → bold kalau belum ada format lain
+    bold_rows = (is_total & (row_code == FMT_NONE))[:, None]
+    fmt = np.where((fmt == FMT_NONE) & bold_rows, FMT_BOLD, fmt)
+
+    row_2d = row_code[:, None]
+    codes = np.where(
+        is_pct,
+        np.where(fmt != FMT_NONE, fmt, FMT_PCT),
+        np.where(
+            is_num,
+            np.where(fmt != FMT_NONE, fmt, np.where(row_2d != FMT_NONE, row_2d, FMT_RP)),
+            np.where(row_2d != FMT_NONE, row_2d, fmt),
+        ),
+    ).astype(np.int8)
+
+    # NaN / inf tidak ditulis
+    skip = df.isna().to_numpy()
+    if num_cols:
+        num_pos = [columns.index(c) for c in num_cols]
+        skip[:, num_pos] |= np.isinf(df[num_cols].to_numpy(dtype=float))
+    codes[skip] = FMT_SKIP
+
+    return codes
+
+def write_sheet_columns(worksheet, df, codes, formats, start_row=1):
+    """Tulis data per kolom: satu write_column untuk setiap run kode format yang sama."""
+    n_rows = len(df)
+    if n_rows == 0:
+        return
+    for c in range(df.shape[1]):
+        values = df.iloc[:, c].tolist()
+        col_codes = codes[:, c]
+        breaks = np.flatnonzero(col_codes[1:] != col_codes[:-1]) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [n_rows]))
+        for s, e in zip(starts, ends):
+            code = col_codes[s]
+            if code == FMT_SKIP:
+                continue
+            worksheet.write_column(start_row + s, c, values[s:e], formats[code])
+
+# Batas bawah 10^k untuk menghitung jumlah digit tanpa log10 (presisi float)
+_POW10 = 10.0 ** np.arange(1, 19)
+
+def number_display_width(values, decimals=0):
+    """
+    Lebar teks angka seperti yang tampil di Excel dengan format '#,##0'
+    (decimals=1 → '#,##0.0'): digit + pemisah ribuan + tanda minus + desimal.
+    NaN / inf tidak ditulis ke sheet, jadi lebarnya 0.
+    """
+    x = np.asarray(values, dtype=float)
+    x = x[np.isfinite(x)]
+    if x.size == 0:
+        return 0
+    int_part = np.floor(np.round(np.abs(x), decimals))
+    digits = np.searchsorted(_POW10, int_part, side="right") + 1
+    width = digits + (digits - 1) // 3 + (x < 0)
+    if decimals:
+        width += decimals + 1
+    return int(width.max())
+
+def text_display_width(series):
+    """Lebar teks terpanjang, dihitung dari nilai unik saja (kategori yang terpakai)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        values = series.cat.categories[np.unique(codes[codes >= 0])]
+    else:
+        values = pd.Index(pd.unique(series.dropna().to_numpy()))
+    if len(values) == 0:
+        return 0
+    return int(values.astype(str).str.len().max())
+
+def column_widths(df):
+    """
+    AUTOFIT: lebar tiap kolom = teks terpanjang (header atau isi) + 2.
+    Kolom angka dihitung dari format export (#,##0 dan #,##0.0"%"), jadi
+    lebarnya sama dengan yang tampil di Excel, tanpa astype(str) seluruh kolom.
+    """
+    widths = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            if "%" in col:
+                width = number_display_width(series.to_numpy(), decimals=1) + 1  # + "%"
+            else:
+                width = number_display_width(series.to_numpy())
+        else:
+            width = text_display_width(series)
+        widths.append(max(len(str(col)), width) + 2)
+    return widths
+
+# Mode constant_memory: xlsxwriter hanya menerima baris berurutan, jadi data
+# ditulis per baris; list nilai dibuat per blok supaya memory tetap kecil
+ROW_CHUNK = 10_000
+
+def write_sheet_rows(worksheet, df, codes, formats, start_row=1):
+    """Versi per baris dari write_sheet_columns: satu write_row per run kode format yang sama."""
+    n_rows, n_cols = df.shape
+    for chunk_start in range(0, n_rows, ROW_CHUNK):
+        chunk_end = min(chunk_start + ROW_CHUNK, n_rows)
+        # tolist() → tipe Python (int/float/str) seperti di write_sheet_columns
+        columns = [df.iloc[chunk_start:chunk_end, c].tolist() for c in range(n_cols)]
+        for r, values in enumerate(zip(*columns), start=chunk_start):
+            row_codes = codes[r]
+            breaks = np.flatnonzero(row_codes[1:] != row_codes[:-1]) + 1
+            starts = np.concatenate(([0], breaks))
+            ends = np.concatenate((breaks, [n_cols]))
+            for s, e in zip(starts, ends):
+                code = row_codes[s]
+                if code == FMT_SKIP:
+                    continue
+                worksheet.write_row(start_row + r, s, values[s:e], formats[code])
+
+def build_sheet_plan(sheet, df):
+    """Bagian sheet yang bisa dipakai ulang: matrix kode format + lebar kolom (autofit)."""
+    codes = build_format_codes(sheet, df)
+    widths = column_widths(drop_row_kind(df))
+    return codes, widths
+
+# Fungsi "Super Button" & Formatting
+def write_multi_sheet_excel(target, selected_sheets, df_dict, plan=build_sheet_plan, constant_memory=False):
+    """
+    Tulis workbook Super Button ke `target` (path atau file object).
+    plan(sheet, df) → (kode format, lebar kolom); bisa diganti versi yang di-cache.
+    constant_memory=True → xlsxwriter menyimpan baris ke temp file di disk,
+    bukan menahan seluruh sheet di RAM (data harus ditulis per baris).
+    """
+    options = {"constant_memory": True} if constant_memory else {}
+    n_rows = sum(len(df_dict[sheet]) for sheet in selected_sheets)
+
+    with perf_stage("export", rows=n_rows, sheets=len(selected_sheets), constant_memory=constant_memory):
+        with pd.ExcelWriter(target, engine="xlsxwriter", engine_kwargs={"options": options}) as writer:
+            # Format dibuat sekali per workbook, dipakai bersama oleh semua sheet
+            formats = build_workbook_formats(writer.book)
+
+            for sheet in selected_sheets:
+                df = df_dict[sheet]
+                # Kolom ROW_KIND hanya dipakai untuk plan format, tidak ditulis ke sheet
+                data = drop_row_kind(df)
+                # Header saja, data ditulis per kolom di bawah
+                data.head(0).to_excel(writer, index=False, sheet_name=sheet)
+
+                worksheet = writer.sheets[sheet]
+
+                # ================= WRITE CELL =================
+                codes, widths = plan(sheet, df)
+                if constant_memory:
+                    write_sheet_rows(worksheet, data, codes, formats)
+                else:
+                    write_sheet_columns(worksheet, data, codes, formats)
+
+                # ================= AUTOFIT =================
+                for i, width in enumerate(widths):
+                    worksheet.set_column(i, i, width)
+
+def generate_multi_sheet_excel(selected_sheets, df_dict, plan=build_sheet_plan):
+    output = BytesIO()
+    write_multi_sheet_excel(output, selected_sheets, df_dict, plan)
+    output.seek(0)
+    return output.getvalue()
+
+# Export di atas batas ini ditulis lewat temp file (constant_memory) dan tidak di-cache
+EXPORT_STREAM_MIN_CELLS = 1_000_000
+
+def export_cell_count(selected_sheets, df_dict):
+    return sum(df_dict[sheet].size for sheet in selected_sheets)
+
+def stream_multi_sheet_excel(selected_sheets, df_dict):
+    """
+    Export untuk tender besar: workbook ditulis ke temp file dengan constant_memory,
+    lalu file handle-nya (bukan bytes) diberikan ke download button. Tidak ada
+    BytesIO + getvalue(), jadi tidak ada salinan workbook kedua di RAM.
+    Temp file terhapus otomatis saat handle ditutup / di-garbage-collect.
+    """
+    # buffering=0 → FileIO (io.RawIOBase), tipe file yang diterima st.download_button
+    output = tempfile.TemporaryFile(suffix=".xlsx", buffering=0)
+    write_multi_sheet_excel(output, selected_sheets, df_dict, constant_memory=True)
+    output.seek(0)
+    return output
+
+# ================= FINGERPRINT =================
+def dataframe_fingerprint(df):
+    """Hash isi DataFrame (kolom, dtype, index & nilai) untuk key cache export."""
+    h = hashlib.sha1()
+    h.update(repr(list(df.columns)).encode())
+    h.update(repr([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
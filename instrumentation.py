@@ -0,0 +1,141 @@
+"""
+Instrumentasi opt-in untuk stage pipeline & export Super Button.
+
+Setiap stage mencatat wall time, jumlah baris yang diproses dan peak memory
+(tracemalloc), lalu ditulis sebagai satu baris log JSON (logger "tco.perf")
+untuk log collector. Default mati: aktifkan lewat env TCO_PERF=1 atau enable().
+
+Dipakai sebagai decorator (@instrumented("merge")) atau context manager
+(with perf_stage("export", rows=n): ...). Saat mati, overhead-nya cuma satu
+pengecekan flag. Saat aktif, tracemalloc memperlambat stage beberapa kali lipat,
+jadi angka waktu dibaca sebagai perbandingan antar stage, bukan waktu produksi.
+tracemalloc berlaku per proses: kalau beberapa session jalan bersamaan, peak
+memory satu stage bisa ikut menghitung alokasi session lain.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_LOGGER = logging.getLogger("tco.perf")
+
+_enabled = False
+# Record & stack stage per thread (Streamlit menjalankan tiap script run di thread-nya)
+_local = threading.local()
+# tracemalloc global per proses: start/stop dihitung supaya thread lain tidak ikut mati
+_trace_lock = threading.Lock()
+_trace_users = 0
+# True kalau tracemalloc di-start modul ini; yang di-start pihak lain tidak boleh di-stop
+_trace_owned = False
+
+def is_enabled():
+    return _enabled
+
+def enable(flag=True):
+    """Nyalakan / matikan instrumentasi untuk seluruh proses."""
+    global _enabled
+    _enabled = bool(flag)
+    if _enabled and not _LOGGER.handlers:
+        # Satu baris JSON per stage, tanpa prefix, supaya mudah di-parse log collector
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _LOGGER.addHandler(handler)
+        _LOGGER.setLevel(logging.INFO)
+        _LOGGER.propagate = False
+
+def reset():
+    """Kosongkan record thread ini (dipanggil di awal setiap script run)."""
+    _local.records = []
+
+def records():
+    """Record stage yang sudah selesai di thread ini, urut waktu selesai."""
+    return list(getattr(_local, "records", []))
+
+def _trace_start():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        if _trace_users == 0:
+            _trace_owned = not tracemalloc.is_tracing()
+            if _trace_owned:
+                tracemalloc.start()
+        _trace_users += 1
+
+def _trace_stop():
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+
+@contextmanager
+def perf_stage(name, rows=None, **fields):
+    """
+    Ukur satu stage. Record (dict) di-yield supaya pemanggil bisa mengisi
+    rows / field lain setelah hasilnya ada. Stage boleh bersarang: peak stage
+    luar tetap mencakup peak stage di dalamnya.
+
+    Setiap stage memanggil tracemalloc.reset_peak(): kalau ada pengukuran
+    tracemalloc lain di proses yang sama (misal benchmark), matikan
+    instrumentasi selama pengukuran itu.
+    """
+    if not _enabled:
+        yield {}
+        return
+
+    stack = _local.__dict__.setdefault("stack", [])
+    _trace_start()
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1]["max_peak"] = max(stack[-1]["max_peak"], peak)
+    tracemalloc.reset_peak()
+    frame = {"start": current, "max_peak": current}
+    stack.append(frame)
+
+    record = {"stage": name, "rows": rows, **fields}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        peak = max(frame["max_peak"], tracemalloc.get_traced_memory()[1])
+        stack.pop()
+        if stack:
+            stack[-1]["max_peak"] = max(stack[-1]["max_peak"], peak)
+        _trace_stop()
+
+        record["seconds"] = round(seconds, 6)
+        record["peak_mib"] = round((peak - frame["start"]) / 2**20, 3)
+        record["depth"] = len(stack)
+        # Thread yang tidak pernah reset() (misal callable download button) cukup di-log
+        if hasattr(_local, "records"):
+            _local.records.append(record)
+        _LOGGER.info(json.dumps({"event": "perf_stage", **record}, default=str))
+
+def count_rows(result):
+    """Jumlah baris hasil stage: len(DataFrame), atau total baris list (nama, DataFrame)."""
+    if isinstance(result, list) and result and isinstance(result[0], tuple):
+        return sum(len(item[-1]) for item in result)
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+def instrumented(name, rows=count_rows):
+    """Decorator: bungkus fungsi sebagai stage `name`; rows dihitung dari hasil fungsi."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with perf_stage(name) as record:
+                result = fn(*args, **kwargs)
+                record["rows"] = rows(result)
+            return result
+        return wrapper
+    return decorator
+
+enable(os.environ.get("TCO_PERF", "") == "1")
@@ -0,0 +1,787 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+import warnings
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from io import BytesIO
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from instrumentation import instrumented, perf_stage
+
+# Angka gaya Indonesia: titik = ribuan, koma = desimal (misal "1.000" / "7.500,50")
+_ID_NUMBER = re.compile(r"^-?\d{1,3}(\.\d{3})*(,\d+)?$|^-?\d+(,\d+)?$")
+
+def _is_empty(x):
+    return x is None or (isinstance(x, str) and not x.strip())
+
+def to_number(x):
+    """Ubah satu cell jadi angka; None kalau bukan angka."""
+    if isinstance(x, bool):
+        return None
+    if isinstance(x, (int, float, np.number)):
+        return x
+    if isinstance(x, str):
+        s = x.strip()
+        if _ID_NUMBER.match(s):
+            num = float(s.replace(".", "").replace(",", "."))
+            return int(num) if num.is_integer() else num
+    return None
+
+def _year_label(x):
+    # 2025 / 2025.0 / "2025" → "2025"
+    num = to_number(x)
+    if num is not None and float(num).is_integer():
+        return str(int(num))
+    return "" if _is_empty(x) else str(x).strip()
+
+def find_table(rows, first_row=1, first_col=1):
+    """
+    Satu pass atas baris sheet untuk floating table: cari bounding box cell
+    terisi sambil menyimpan baris yang terisi saja.
+
+    Return (bounds, body, row_numbers): bounds = (min_row, min_col, max_row,
+    max_col) 1-based sesuai koordinat Excel, body = baris terisi yang sudah
+    dipotong ke bounding box, row_numbers = nomor baris Excel tiap baris body.
+    (None, [], []) kalau sheet kosong.
+    """
+    kept = []
+    min_col = max_col = None
+    for r, row in enumerate(rows, start=first_row):
+        if row is None:
+            continue
+        filled = [c for c, x in enumerate(row) if not _is_empty(x)]
+        if not filled:
+            continue
+        min_col = filled[0] if min_col is None else min(min_col, filled[0])
+        max_col = filled[-1] if max_col is None else max(max_col, filled[-1])
+        kept.append((r, row))
+
+    if not kept:
+        return None, [], []
+
+    width = max_col - min_col + 1
+    body = []
+    for _, row in kept:
+        cells = list(row[min_col:max_col + 1])
+        body.append(cells + [None] * (width - len(cells)))
+
+    bounds = (kept[0][0], first_col + min_col, kept[-1][0], first_col + max_col)
+    return bounds, body, [r for r, _ in kept]
+
+def table_range(bounds):
+    """(2, 2, 8, 5) → "B2:E8"."""
+    min_row, min_col, max_row, max_col = bounds
+    return f"{get_column_letter(min_col)}{min_row}:{get_column_letter(max_col)}{max_row}"
+
+def parse_vendor_rows(rows, first_row=1, first_col=1):
+    """
+    Ubah baris mentah satu sheet (tuple per baris) jadi DataFrame vendor.
+
+    Floating table: baris & kolom kosong di atas/kiri tabel dibuang, baris
+    pertama yang terisi dipakai sebagai header. Kolom pertama = YEAR, kolom
+    angka di ujung kanan = region, sisanya kolom non-numeric (SCOPE, DESC, ...).
+    Posisi tabel disimpan di df.attrs["table_range"] (misal "B2:E8").
+
+    Cell bukan angka di kolom region (misal "N/A") jadi NaN dan dicatat di
+    df.attrs["invalid_cells"] sebagai {alamat cell: isi}, misal {"D5": "N/A"}.
+    """
+    bounds, body, row_numbers = find_table(rows, first_row, first_col)
+    if not body:
+        return pd.DataFrame()
+
+    header = [str(h).strip().upper() if not _is_empty(h) else "" for h in body[0]]
+    header[0] = "YEAR"
+    df = pd.DataFrame(body[1:], columns=header)
+
+    # Kolom numeric = deretan kolom paling kanan yang mayoritas isinya angka:
+    # satu cell "N/A" tidak mengubah kolom harga jadi kolom teks
+    n_text = len(header)
+    for c in range(len(header) - 1, 0, -1):
+        values = [to_number(x) for x in df.iloc[:, c] if not _is_empty(x)]
+        n_num = sum(v is not None for v in values)
+        if n_num * 2 < len(values):
+            break
+        n_text = c
+
+    df.isetitem(0, [_year_label(x) for x in df.iloc[:, 0]])
+    for c in range(1, n_text):
+        df.isetitem(c, ["" if _is_empty(x) else str(x).strip() for x in df.iloc[:, c]])
+    invalid = {}
+    for c in range(n_text, len(header)):
+        values = []
+        for r, x in enumerate(df.iloc[:, c]):
+            num = np.nan if _is_empty(x) else to_number(x)
+            if num is None:
+                invalid[f"{get_column_letter(bounds[1] + c)}{row_numbers[r + 1]}"] = str(x)
+                num = np.nan
+            values.append(num)
+        df.isetitem(c, pd.to_numeric(pd.Series(values, dtype=object)))
+
+    df.attrs["table_range"] = table_range(bounds)
+    if invalid:
+        df.attrs["invalid_cells"] = invalid
+    return df
+
+def read_vendor_sheet(ws):
+    """
+    Parse satu worksheet. Dimension metadata sheet (misal "B2:E8") dipakai
+    sebagai titik awal scan, jadi area kosong di atas/kiri tabel tidak dibaca.
+
+    Batas akhir dimension tidak dipakai: sebagian writer menulis placeholder
+    ("A1") atau dimension yang tidak di-update, dan openpyxl akan memotong
+    tabel tanpa error. Scan tetap jalan sampai cell terakhir yang benar-benar
+    ada di XML sheet.
+    """
+    min_row, min_col, max_row, max_col = ws.min_row, ws.min_column, ws.max_row, ws.max_column
+    if (
+        max_row is None
+        or (min_row, min_col) == (max_row, max_col)
+        or min_row > max_row
+        or min_col > max_col
+    ):
+        # Tanpa <dimension>, placeholder 1 cell atau terbalik → scan dari A1
+        min_row = min_col = 1
+    ws.reset_dimensions()
+    rows = ws.iter_rows(min_row=min_row, min_col=min_col, values_only=True)
+    return parse_vendor_rows(rows, first_row=min_row, first_col=min_col)
+
+def iter_vendor_sheets(source):
+    """
+    Baca workbook vendor secara streaming (openpyxl read-only): yield
+    (nama vendor, DataFrame) satu sheet per iterasi, tanpa memuat seluruh
+    workbook ke memory.
+    """
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            df = read_vendor_sheet(ws)
+            if not df.empty:
+                yield ws.title.strip(), df
+    finally:
+        wb.close()
+
+# Di bawah jumlah sheet ini, overhead process pool lebih mahal dari parsing-nya
+PARALLEL_MIN_SHEETS = 8
+
+def default_ingest_workers():
+    """
+    Jumlah worker parsing sheet: env TCO_INGEST_WORKERS, default 1 (serial).
+
+    Pool opt-in karena hanya menguntungkan kalau ada >1 core dan workbook-nya
+    punya banyak sheet berukuran besar: tiap worker membayar start process +
+    buka workbook (shared strings) + kirim DataFrame balik (pickle), jadi di
+    1 core pool selalu lebih lambat dari serial. Ukur dengan
+    benchmarks.parallel_ingest. Nilai yang bukan angka diabaikan (warning).
+    """
+    value = os.environ.get("TCO_INGEST_WORKERS", "").strip()
+    if not value:
+        return 1
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        warnings.warn(f"TCO_INGEST_WORKERS={value!r} is not an integer, parsing sheets serially")
+        return 1
+
+INGEST_WORKERS = default_ingest_workers()
+
+def _parse_sheet_chunk(source, sheet_names):
+    # Worker process: buka workbook sendiri, parse sheet bagiannya saja
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        parsed = []
+        for name in sheet_names:
+            df = read_vendor_sheet(wb[name])
+            if not df.empty:
+                parsed.append((name.strip(), df))
+        return parsed
+    finally:
+        wb.close()
+
+def _read_source(source):
+    # Path tetap path; file upload / buffer → bytes (bisa dibaca ulang & dikirim ke worker)
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    return source.getvalue() if hasattr(source, "getvalue") else source.read()
+
+@instrumented("ingestion")
+def load_vendor_sheets(source, workers=None, min_sheets=PARALLEL_MIN_SHEETS, sheet_names=None):
+    """
+    Parse semua sheet vendor (atau hanya `sheet_names`), paralel dengan
+    ProcessPoolExecutor kalau sheet-nya banyak. Hasil tetap urut sesuai urutan
+    sheet di workbook.
+
+    workers=None → INGEST_WORKERS; workers=1 atau sheet < min_sheets → serial.
+    """
+    source = _read_source(source)
+
+    if sheet_names is None:
+        wb = load_workbook(BytesIO(source) if isinstance(source, bytes) else source, read_only=True)
+        sheet_names = wb.sheetnames
+        wb.close()
+    if not sheet_names:
+        return []
+
+    workers = min(workers or INGEST_WORKERS, len(sheet_names))
+    if workers <= 1 or len(sheet_names) < min_sheets:
+        return _parse_sheet_chunk(source, sheet_names)
+
+    # Sheet dibagi rata per worker (berurutan), supaya tiap worker cukup buka workbook sekali
+    chunks = [list(c) for c in np.array_split(np.array(sheet_names, dtype=object), workers)]
+    if not isinstance(source, bytes):
+        return _parse_in_pool(source, chunks)
+    # Upload (bytes) ditulis sekali ke temp file: worker menerima path-nya,
+    # bukan salinan pickle seluruh workbook per chunk
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        return _parse_in_pool(path, chunks)
+    finally:
+        os.remove(path)
+
+def _pool_context():
+    # Worker di-start bersih (forkserver / spawn), bukan fork dari proses server
+    # Streamlit yang multi-thread: fork bisa mewarisi lock yang sedang dipegang
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+def _parse_in_pool(path, chunks):
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=_pool_context()) as pool:
+        results = pool.map(_parse_sheet_chunk, [path] * len(chunks), chunks)
+        return [item for chunk in results for item in chunk]
+
+# ================= ROW KIND =================
+# Jenis baris, dibuat bersamaan dengan TOTAL row dan dibawa sebagai kolom
+# int8 ROW_KIND_COL (kolom paling kanan). Karena kolom biasa, nilainya ikut
+# setiap sort / filter / slice baris. Styling & export cukup lookup mask ini,
+# tidak perlu scan string "TOTAL" di setiap cell; kolomnya dibuang
+# (drop_row_kind) sebelum tabel ditampilkan atau ditulis ke Excel.
+ROW_DETAIL, ROW_YEAR_TOTAL, ROW_VENDOR_TOTAL, ROW_GRAND_TOTAL = range(4)
+ROW_KIND_COL = "ROW_KIND"
+
+def set_row_kind(df, kind):
+    df[ROW_KIND_COL] = np.asarray(kind, dtype=np.int8)
+    return df
+
+def drop_row_kind(df):
+    """df tanpa kolom ROW_KIND_COL (untuk tampilan & export)."""
+    if ROW_KIND_COL not in df.columns:
+        return df
+    return df.drop(columns=ROW_KIND_COL)
+
+def _upper_str(values):
+    # Sama dengan str(x).strip().upper(), tapi sekali jalan per kolom
+    return pd.Series(values).astype(str).str.strip().str.upper().to_numpy()
+
+def infer_row_kind(df):
+    """
+    Fallback untuk frame tanpa kolom ROW_KIND_COL (misal dibuat di luar pipeline):
+    jenis baris ditebak dari label "TOTAL" di kolom non-numeric.
+    """
+    is_total = np.zeros(len(df), dtype=bool)
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        # Kolom numeric tidak mungkin berisi "TOTAL"
+        if pd.api.types.is_numeric_dtype(col):
+            continue
+        is_total |= _upper_str(col) == "TOTAL"
+
+    if "VENDOR" in df.columns and "YEAR" in df.columns:
+        # Merge Data / Cost Summary: YEAR == TOTAL → TOTAL vendor, sisanya TOTAL year
+        vendor_total = _upper_str(df["YEAR"]) == "TOTAL"
+        return np.select(
+            [vendor_total, is_total], [ROW_VENDOR_TOTAL, ROW_YEAR_TOTAL], ROW_DETAIL
+        ).astype(np.int8)
+    return np.where(is_total, ROW_GRAND_TOTAL, ROW_DETAIL).astype(np.int8)
+
+def row_kind(df):
+    """Array jenis baris (ROW_*) untuk df, dari kolom ROW_KIND_COL kalau ada."""
+    if ROW_KIND_COL in df.columns:
+        return df[ROW_KIND_COL].to_numpy()
+    return infer_row_kind(df)
+
+# ================= MERGE DATA =================
+def region_columns(df):
+    """Kolom region (numeric) di df, tanpa kolom TOTAL & ROW_KIND_COL."""
+    return [
+        c for c in df.columns
+        if c not in ("TOTAL", ROW_KIND_COL) and pd.api.types.is_numeric_dtype(df[c])
+    ]
+
+def check_vendor_sheet(vendor, df):
+    """
+    Validasi satu sheet hasil parse sebelum di-merge: minimal satu kolom region
+    numeric, dan setiap kolom region punya minimal satu harga. ValueError
+    (dengan nama sheet) kalau tidak.
+    """
+    regions = region_columns(df)
+    if not regions:
+        raise ValueError(
+            f"Sheet '{vendor}': no numeric region columns found; "
+            "region prices must be the right-most columns of the table."
+        )
+    empty = [c for c in regions if df[c].isna().all()]
+    if empty:
+        raise ValueError(f"Sheet '{vendor}': region column(s) {', '.join(empty)} contain no prices.")
+
+def _sheet_layout(df):
+    # (kolom YEAR + teks + region sesuai urutan, kolom region), tanpa kolom hasil merge
+    columns = tuple(c for c in df.columns if c not in ("VENDOR", "TOTAL", ROW_KIND_COL))
+    return columns, tuple(region_columns(df))
+
+def check_merge_layout(sheets):
+    """
+    Semua sheet [(vendor, df)] harus punya layout kolom yang sama dengan sheet
+    pertama (nama & urutan kolom, kolom mana yang region). ValueError dengan
+    nama sheet yang berbeda kalau tidak, atau kalau tidak ada sheet sama sekali.
+    """
+    if not sheets:
+        raise ValueError("No vendor table found in the workbook.")
+    first, expected = sheets[0][0], _sheet_layout(sheets[0][1])
+    for vendor, df in sheets[1:]:
+        columns, regions = _sheet_layout(df)
+        if columns != expected[0]:
+            raise ValueError(
+                f"Sheet '{vendor}': columns {list(columns)} do not match "
+                f"sheet '{first}' {list(expected[0])}."
+            )
+        if regions != expected[1]:
+            raise ValueError(
+                f"Sheet '{vendor}': region columns {list(regions)} do not match "
+                f"sheet '{first}' {list(expected[1])}."
+            )
+
+@instrumented("merge")
+def build_merge_table(detail):
+    """
+    Tabel MERGE DATA dari baris detail (kolom VENDOR, YEAR, teks, angka).
+
+    Kolom TOTAL = jumlah per baris. TOTAL row per (VENDOR, YEAR) dihitung dengan
+    satu groupby, TOTAL row per VENDOR dari rollup hasil groupby tsb. Semua baris
+    digabung sekali lalu diurutkan dengan sort key (urutan vendor, urutan year,
+    jenis baris, posisi asli), jadi urutannya sama seperti tampilan di guide:
+    detail year → TOTAL year → ... → TOTAL vendor.
+
+    Layout sheet divalidasi sebelumnya (check_vendor_sheet / check_merge_layout);
+    di sini hanya dipastikan ada baris dan kolom region numeric.
+    """
+    num_cols = region_columns(detail)
+    if detail.empty or not num_cols:
+        raise ValueError("Merge Data needs at least one row and one numeric region column.")
+    text_cols = [c for c in detail.columns if c not in num_cols and c not in ("VENDOR", "YEAR")]
+    label_col = text_cols[0] if text_cols else None
+
+    detail = detail.assign(TOTAL=detail[num_cols].sum(axis=1))
+    sum_cols = num_cols + ["TOTAL"]
+
+    # Kode (vendor, year) sesuai urutan kemunculan pertama
+    vendor_code, vendors = pd.factorize(detail["VENDOR"])
+    pair_code, pairs = pd.factorize(pd.MultiIndex.from_arrays([detail["VENDOR"], detail["YEAR"]]))
+    pair_vendor = vendors.get_indexer(pairs.get_level_values(0))
+
+    year_sum = detail[sum_cols].groupby(pair_code, sort=True).sum()
+    vendor_sum = year_sum.groupby(pair_vendor, sort=True).sum()
+
+    def total_rows(sums, vendor, year, label):
+        rows = pd.DataFrame({c: "" for c in text_cols}, index=range(len(sums)))
+        rows.insert(0, "YEAR", year)
+        rows.insert(0, "VENDOR", vendor)
+        if label_col:
+            rows[label_col] = label
+        for c in sum_cols:
+            rows[c] = sums[c].to_numpy()
+        return rows[detail.columns]
+
+    year_rows = total_rows(year_sum, pairs.get_level_values(0), pairs.get_level_values(1), "TOTAL")
+    vendor_rows = total_rows(vendor_sum, vendors, "TOTAL", "")
+
+    n_detail, n_pairs = len(detail), len(pairs)
+    key_vendor = np.concatenate([vendor_code, pair_vendor, np.arange(len(vendors))])
+    key_year = np.concatenate([pair_code, np.arange(n_pairs), np.full(len(vendors), n_pairs)])
+    key_kind = np.concatenate([
+        np.full(n_detail, ROW_DETAIL), np.full(n_pairs, ROW_YEAR_TOTAL), np.full(len(vendors), ROW_VENDOR_TOTAL)
+    ])
+    key_pos = np.arange(n_detail + n_pairs + len(vendors))
+
+    merged = pd.concat([detail, year_rows, vendor_rows], ignore_index=True)
+    order = np.lexsort((key_pos, key_kind, key_year, key_vendor))
+    # Jenis baris ikut diurutkan, jadi langsung jadi row_kind hasil merge
+    return set_row_kind(categorize_ids(merged.iloc[order].reset_index(drop=True)), key_kind[order])
+
+# Label baris TOTAL selalu jadi kategori paling akhir
+TOTAL_LABELS = ["TOTAL", ""]
+
+def categorize_ids(df):
+    """
+    Kolom identitas (VENDOR, YEAR, kolom teks) → pandas Categorical.
+
+    Kategori mengikuti urutan kemunculan, dengan "TOTAL" (dan "" untuk baris
+    TOTAL vendor) sebagai kategori eksplisit di akhir. groupby / pivot / sort
+    berikutnya cukup jalan di integer codes.
+    """
+    df = df.copy()
+    for c in df.columns:
+        if pd.api.types.is_numeric_dtype(df[c]):
+            continue
+        values = df[c].astype(object)
+        uniques = [u for u in pd.unique(values) if u not in TOTAL_LABELS]
+        totals = [t for t in TOTAL_LABELS if (values == t).any()]
+        df[c] = pd.Categorical(values, categories=uniques + totals)
+    return df
+
+def add_total_rows(vendor, df):
+    """Tambah kolom VENDOR & TOTAL, TOTAL row per year dan TOTAL row vendor."""
+    return build_merge_table(df.assign(VENDOR=vendor)[["VENDOR", *df.columns]])
+
+def _shared_strings(zf):
+    strings = []
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return strings
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, el in ElementTree.iterparse(f):
+            if el.tag.endswith("}si"):
+                strings.append("".join(t.text or "" for t in el.iter() if t.tag.endswith("}t")))
+                el.clear()
+    return strings
+
+def _sheet_parts(zf):
+    # (nama sheet, path XML di zip) sesuai urutan di workbook.xml
+    ns_rel = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {r.get("Id"): r.get("Target") for r in rels}
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+
+    parts = []
+    for sheet in workbook.iter():
+        if sheet.tag.endswith("}sheet"):
+            target = targets[sheet.get(ns_rel)]
+            path = target.lstrip("/") if target.startswith("/") else "xl/" + target
+            parts.append((sheet.get("name"), path))
+    return parts
+
+_SHARED_STRING_CELL = re.compile(rb'<c\b[^>]*\bt="s"[^>]*>\s*<v>(\d+)</v>')
+
+def sheet_fingerprints(source):
+    """
+    Hash isi tiap sheet langsung dari zip .xlsx (XML sheet + teks shared string
+    yang dipakai sheet tsb), tanpa parsing openpyxl. Return {nama sheet: sha1}.
+    """
+    source = _read_source(source)
+    with zipfile.ZipFile(BytesIO(source) if isinstance(source, bytes) else source) as zf:
+        strings = _shared_strings(zf)
+        fingerprints = {}
+        for name, path in _sheet_parts(zf):
+            xml = zf.read(path)
+            h = hashlib.sha1(xml)
+            for idx in _SHARED_STRING_CELL.findall(xml):
+                h.update(strings[int(idx)].encode())
+                h.update(b"\0")
+            fingerprints[name] = h.hexdigest()
+    return fingerprints
+
+def _merge_incremental(source, workers, cache):
+    # Key cache = (nama sheet, fingerprint isi): sheet yang di-rename atau dua sheet
+    # dengan isi identik tetap punya block (dan label VENDOR) sendiri-sendiri
+    source = _read_source(source)
+    keys = list(sheet_fingerprints(source).items())
+    changed = [key for key in keys if key not in cache]
+
+    if changed:
+        parsed = dict(load_vendor_sheets(source, workers=workers, sheet_names=[name for name, _ in changed]))
+        for name, fp in changed:
+            vendor = name.strip()
+            df = parsed.get(vendor)
+            if df is not None:
+                check_vendor_sheet(vendor, df)
+            # None = sheet kosong, tetap di-cache supaya tidak di-parse lagi
+            cache[name, fp] = None if df is None else (
+                vendor, add_total_rows(vendor, df), df.attrs.get("table_range"), df.attrs.get("invalid_cells")
+            )
+
+    # Buang block dari upload lama yang sudah tidak ada
+    current = set(keys)
+    for key in [key for key in cache if key not in current]:
+        del cache[key]
+
+    blocks = [cache[key] for key in keys if cache[key] is not None]
+    check_merge_layout([(vendor, block) for vendor, block, _, _ in blocks])
+    return blocks
+
+@instrumented("merge_vendor_workbook")
+def merge_vendor_workbook(source, workers=1, cache=None):
+    """
+    MERGE DATA: gabungkan semua sheet vendor jadi satu tabel dengan TOTAL row.
+
+    workers=1 (default): sheet di-stream satu per satu, jadi peak memory ~ sheet
+    terbesar + hasil merge. workers>1 / None (= INGEST_WORKERS): parsing sheet
+    paralel lewat load_vendor_sheets.
+
+    cache (dict, opsional): block vendor hasil merge (dengan TOTAL row per year
+    & vendor) disimpan per (nama sheet, fingerprint isi). Upload ulang dengan
+    satu sheet yang diperbaiki hanya mem-parse dan menghitung ulang block
+    vendor tersebut.
+
+    df.attrs: "table_ranges" = {vendor: posisi tabel}, "invalid_cells" =
+    {vendor: {alamat cell: isi}} untuk cell harga bukan angka yang jadi NaN.
+
+    ValueError (dengan nama sheet-nya) kalau workbook tidak berisi tabel vendor,
+    kolom region sebuah sheet tidak numeric / kosong, atau layout kolom antar
+    sheet berbeda.
+    """
+    ranges, invalid = {}, {}
+    if cache is not None:
+        merged = []
+        for vendor, block, cell_range, cells in _merge_incremental(source, workers, cache):
+            merged.append(block)
+            ranges[vendor] = cell_range
+            if cells:
+                invalid[vendor] = cells
+        # Kategori tiap block vendor berbeda → samakan lagi setelah digabung
+        df_merge = categorize_ids(pd.concat(merged, ignore_index=True))
+    else:
+        if workers == 1:
+            # Generator: parsing terjadi di loop di bawah, jadi loop itu yang diukur
+            sheets = iter_vendor_sheets(source)
+            stage = perf_stage("ingestion")
+        else:
+            # load_vendor_sheets sudah tercatat sebagai stage "ingestion"
+            sheets = load_vendor_sheets(source, workers=workers)
+            stage = nullcontext({})
+
+        # Semua sheet ditumpuk sekali, lalu TOTAL row dihitung dalam satu pass
+        detail = []
+        with stage as record:
+            for vendor, df in sheets:
+                check_vendor_sheet(vendor, df)
+                detail.append((vendor, df.assign(VENDOR=vendor)[["VENDOR", *df.columns]]))
+                ranges[vendor] = df.attrs.get("table_range")
+                if df.attrs.get("invalid_cells"):
+                    invalid[vendor] = df.attrs["invalid_cells"]
+            record["rows"] = sum(len(df) for _, df in detail)
+        check_merge_layout(detail)
+        df_merge = build_merge_table(pd.concat([df for _, df in detail], ignore_index=True))
+
+    # Posisi tabel & cell harga yang bukan angka per sheet, untuk ditampilkan ke user
+    df_merge.attrs["table_ranges"] = ranges
+    df_merge.attrs["invalid_cells"] = invalid
+    return df_merge
+
+def _tiled_categorical(values, reps):
+    # Codes di n baris di-tile per region: tanpa copy string object
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    return pd.Categorical.from_codes(np.tile(codes, reps), categories=uniques)
+
+@instrumented("melt")
+def melt_cost_summary(df_merge):
+    """
+    COST SUMMARY: transpose kolom region jadi REGION/PRICE (long format).
+
+    Dibangun langsung dari block NumPy: kolom identitas jadi Categorical yang
+    codes-nya di-tile per region, REGION = codes di-repeat, PRICE = ravel
+    kolom-major dari block harga. Urutan baris sama dengan pd.melt (region
+    demi region, tiap region mengikuti urutan Merge Data).
+    """
+    data = drop_row_kind(df_merge)
+    num_cols = data.select_dtypes(include=["number"]).columns.tolist()
+    region_cols = [c for c in num_cols if c != "TOTAL"]
+    text_cols = [c for c in data.columns if c not in num_cols and c not in ("VENDOR", "YEAR")]
+    n_rows, n_regions = len(df_merge), len(region_cols)
+
+    # Block satu dtype dari pandas berbentuk F-contiguous → ravel("F") tidak meng-copy
+    prices = df_merge[region_cols].to_numpy().ravel(order="F")
+
+    summary = {
+        "VENDOR": _tiled_categorical(df_merge["VENDOR"], n_regions),
+        "YEAR": _tiled_categorical(df_merge["YEAR"], n_regions),
+        "REGION": pd.Categorical.from_codes(
+            np.repeat(np.arange(n_regions), n_rows), categories=region_cols
+        ),
+    }
+    for c in text_cols:
+        summary[c] = _tiled_categorical(df_merge[c], n_regions)
+    summary["PRICE"] = prices
+    return set_row_kind(pd.DataFrame(summary), np.tile(row_kind(df_merge), n_regions))
+
+@instrumented("tco_cube", rows=lambda cube: int(cube["values"].size))
+def build_tco_cube(df_summary):
+    """
+    Cube harga vendor × year × region × scope (NumPy 4-D) dari baris detail
+    Cost Summary, dibangun sekali per upload. Semua tab TCO Summary (dan
+    kombinasi seperti Year × Region) cukup dijumlah dari cube ini.
+
+    Return dict: values (array 4-D) + label tiap axis (vendor, year, region, scope,
+    label axis non-vendor terurut seperti pivot_table).
+    """
+    text_cols = [c for c in df_summary.columns if c not in ("VENDOR", "YEAR", "REGION", "PRICE", ROW_KIND_COL)]
+    scope_col = text_cols[0]
+    axes = {"VENDOR": "VENDOR", "YEAR": "YEAR", "REGION": "REGION", "SCOPE": scope_col}
+
+    # Baris TOTAL tidak ikut, cube hanya berisi harga detail
+    detail = df_summary[row_kind(df_summary) == ROW_DETAIL]
+
+    codes, labels = [], {}
+    for name, col in axes.items():
+        values = detail[col]
+        cat = values.cat if isinstance(values.dtype, pd.CategoricalDtype) else values.astype("category").cat
+        used = np.unique(cat.codes.to_numpy())
+        categories = cat.categories[used]
+        # Vendor ikut urutan sheet; axis lain diurutkan (sama seperti pivot_table)
+        order = np.arange(len(used)) if name == "VENDOR" else np.argsort(categories.astype(str))
+        remap = np.full(len(cat.categories), -1)
+        remap[used[order]] = np.arange(len(used))
+        codes.append(remap[cat.codes.to_numpy()])
+        labels[name] = categories[order].tolist()
+
+    shape = tuple(len(labels[name]) for name in axes)
+    flat = np.ravel_multi_index(codes, shape)
+    prices = detail["PRICE"].to_numpy(dtype=float)
+    cube = np.bincount(flat, weights=np.nan_to_num(prices), minlength=int(np.prod(shape))).reshape(shape)
+
+    if pd.api.types.is_integer_dtype(df_summary["PRICE"]):
+        cube = cube.astype(df_summary["PRICE"].dtype)
+    return {"values": cube, **{name.lower(): labels[name] for name in axes}}
+
+@instrumented("tco_summary")
+def tco_summary(cube, by):
+    """
+    Tabel TCO Summary dari cube: `by` = "YEAR" / "REGION" / "SCOPE" atau tuple
+    kombinasinya (misal ("YEAR", "REGION")). Baris = label axis `by` + TOTAL,
+    kolom = vendor.
+    """
+    by = (by,) if isinstance(by, str) else tuple(by)
+    axis_names = ["VENDOR", "YEAR", "REGION", "SCOPE"]
+    keep = [axis_names.index(b) for b in by]
+    summed_axes = tuple(i for i in range(1, 4) if i not in keep)
+
+    values = cube["values"].sum(axis=summed_axes)
+    # Urutan axis hasil sum: vendor lalu axis `by` sesuai urutan di cube → susun ulang
+    kept_sorted = sorted(keep)
+    values = np.moveaxis(values, [1 + kept_sorted.index(k) for k in keep], range(1, 1 + len(keep)))
+    values = values.reshape(len(cube["vendor"]), -1).T
+
+    index = pd.MultiIndex.from_product([cube[b.lower()] for b in by], names=list(by))
+    table = pd.DataFrame(values, columns=cube["vendor"])
+    for i, name in enumerate(by):
+        table.insert(i, name, index.get_level_values(i))
+
+    total = {name: "TOTAL" if i == 0 else "" for i, name in enumerate(by)}
+    total.update(dict(zip(cube["vendor"], values.sum(axis=0))))
+    table = pd.concat([table, pd.DataFrame([total])], ignore_index=True)
+    return set_row_kind(table, np.append(np.full(len(table) - 1, ROW_DETAIL), ROW_GRAND_TOTAL))
+
+def rank_two_lowest(values):
+    """
+    Kernel ranking untuk matrix harga vendor (baris x vendor), dipakai bersama
+    oleh Bid & Price Analysis, styling tabel dan export Excel.
+
+    Return (first_idx, second_idx, first_val, second_val) per baris. Index = posisi
+    kolom vendor, -1 (dan value NaN) kalau tidak ada. Nilai 0 (vendor tidak ikut
+    tender) dan NaN tidak dihitung; kalau seri, vendor paling kiri menang.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2 or values.shape[1] == 0:
+        empty = np.full(len(values), -1)
+        return empty, empty.copy(), np.full(len(values), np.nan), np.full(len(values), np.nan)
+
+    valid = ~np.isnan(values) & (values != 0)
+    n_valid = valid.sum(axis=1)
+    masked = np.where(valid, values, np.inf)
+    rows = np.arange(len(values))
+
+    first = masked.argmin(axis=1)
+    first_val = masked[rows, first]
+    masked[rows, first] = np.inf
+
+    second = masked.argmin(axis=1)
+    second_val = masked[rows, second]
+
+    first = np.where(n_valid >= 1, first, -1)
+    second = np.where(n_valid >= 2, second, -1)
+    first_val = np.where(first >= 0, first_val, np.nan)
+    second_val = np.where(second >= 0, second_val, np.nan)
+    return first, second, first_val, second_val
+
+@instrumented("analysis")
+def build_bid_analysis(cube):
+    """
+    BID & PRICE ANALYSIS untuk setiap (year, region, scope) sekaligus, langsung
+    dari matrix harga vendor di cube: 1st/2nd lowest + vendor-nya, Gap 1 to 2 (%),
+    Median Price, dan "<vendor> to Median (%)" per vendor (broadcasting).
+    Harga 0 / tidak ada dianggap vendor tidak ikut tender.
+    """
+    vendors = cube["vendor"]
+    # (vendor, year, region, scope) → baris (year, region, scope) x kolom vendor
+    raw = np.moveaxis(cube["values"], 0, -1).reshape(-1, len(vendors))
+    index = pd.MultiIndex.from_product(
+        [cube["year"], cube["region"], cube["scope"]], names=["YEAR", "REGION", "SCOPE"]
+    )
+
+    # Kombinasi yang tidak ditawar vendor mana pun tidak ikut ditampilkan
+    prices = raw.astype(float)
+    valid = ~np.isnan(prices) & (prices != 0)
+    has_bid = valid.any(axis=1)
+    raw, prices, valid, index = raw[has_bid], prices[has_bid], valid[has_bid], index[has_bid]
+
+    first, second, first_val, second_val = rank_two_lowest(prices)
+    vendor_names = np.array(vendors + [None], dtype=object)
+
+    bids = np.where(valid, prices, np.nan)
+    median = np.nanmedian(bids, axis=1)
+    to_median = (bids - median[:, None]) / median[:, None] * 100
+
+    analysis = index.to_frame(index=False)
+    analysis[vendors] = raw
+    analysis["1st Lowest"] = first_val
+    analysis["1st Vendor"] = vendor_names[first]
+    analysis["2nd Lowest"] = second_val
+    analysis["2nd Vendor"] = vendor_names[second]
+    analysis["Gap 1 to 2 (%)"] = np.round((second_val - first_val) / first_val * 100, 2)
+    analysis["Median Price"] = median
+    analysis[[f"{v} to Median (%)" for v in vendors]] = np.round(to_median, 2)
+    return set_row_kind(analysis, np.full(len(analysis), ROW_DETAIL))
+
+# ================= VISUALIZATION =================
+def win_rate_summary(analysis, vendors):
+    """
+    Win rate (%) tiap vendor sebagai 1st dan 2nd dari tabel BID & PRICE ANALYSIS.
+    Output cuma len(vendors) x 2 baris (VENDOR, RANK, WIN RATE (%)) untuk chart;
+    vendor yang tidak pernah menang tetap muncul dengan 0%.
+    """
+    n_rows = max(len(analysis), 1)
+    frames = []
+    for rank in ["1st", "2nd"]:
+        counts = analysis[f"{rank} Vendor"].value_counts().reindex(vendors, fill_value=0)
+        frames.append(pd.DataFrame({
+            "VENDOR": vendors,
+            "RANK": f"{rank} Win Rate (%)",
+            "WIN RATE (%)": counts.to_numpy() / n_rows * 100,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def average_gap_summary(analysis, vendors):
+    """
+    Rata-rata Gap 1 to 2 (%) per vendor ketika vendor tsb di posisi 1st.
+    Return (frame VENDOR, AVG GAP (%), benchmark) — benchmark = rata-rata gap
+    seluruh vendor, dipakai sebagai garis putus-putus di chart.
+    """
+    gap = analysis.groupby("1st Vendor", observed=True)["Gap 1 to 2 (%)"].mean()
+    gap = gap.reindex(vendors)
+    benchmark = gap.mean()
+    summary = pd.DataFrame({"VENDOR": vendors, "AVG GAP (%)": gap.to_numpy()})
+    return summary, benchmark
@@ -0,0 +1,187 @@
+"""
+Engine tampilan tabel di halaman: format rupiah untuk Styler.format dan matrix
+CSS highlight (TOTAL, 1st / 2nd lowest) untuk Styler.apply. Tidak bergantung
+pada Streamlit; cache-nya ada di app.py.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from pipeline import (
+    ROW_DETAIL,
+    ROW_VENDOR_TOTAL,
+    ROW_YEAR_TOTAL,
+    drop_row_kind,
+    rank_two_lowest,
+    row_kind,
+)
+
+def format_rupiah(x):
+    if pd.isna(x):
+        return ""
+    # pastikan bisa diubah ke float
+    try:
+        x = float(x)
+    except:
+        return x  # biarin apa adanya kalau bukan angka
+
+    # kalau tidak punya desimal (misal 7000.0), tampilkan tanpa ,00
+    if x.is_integer():
+        formatted = f"{int(x):,}".replace(",", ".")
+    else:
+        formatted = f"{x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        # hapus ,00 kalau desimalnya 0 semua (misal 7000,00 → 7000)
+        if formatted.endswith(",00"):
+            formatted = formatted[:-3]
+    return formatted
+
+# Memo per nilai: harga yang sama (TOTAL, region, vendor) cukup diformat sekali
+@lru_cache(maxsize=65536)
+def _format_rupiah_float(x):
+    return format_rupiah(x)
+
+def format_rupiah_array(values):
+    """
+    Versi batch dari format_rupiah untuk satu kolom (array NumPy).
+    Hanya nilai unik yang diformat, lalu disebar balik ke semua baris.
+    """
+    arr = np.asarray(values)
+    out = np.full(arr.shape, "", dtype=object)
+
+    if arr.dtype.kind in "biuf":
+        num = arr.astype(float)
+        valid = ~np.isnan(num)
+        uniq, inv = np.unique(num[valid], return_inverse=True)
+        formatted = np.array([_format_rupiah_float(v) for v in uniq.tolist()], dtype=object)
+        out[valid] = formatted[inv]
+    else:
+        # object column (campur angka & teks) → per nilai, tetap lewat format_rupiah
+        out[:] = [format_rupiah(v) for v in arr.tolist()]
+    return out
+
+def rupiah_formatters(df, cols):
+    """Formatter untuk Styler.format: lookup string yang sudah dihitung per kolom."""
+    formatters = {}
+    for col in cols:
+        values = pd.unique(df[col].to_numpy())
+        lookup = dict(zip(values.tolist(), format_rupiah_array(values).tolist()))
+        formatters[col] = lambda x, lookup=lookup: lookup[x] if x in lookup else format_rupiah(x)
+    return formatters
+
+# ================= STYLE ENGINE =================
+CSS_TOTAL        = "font-weight: bold; background-color: #D9EAD3; color: #1A5E20;"
+CSS_BOLD         = "font-weight: bold;"
+CSS_TOTAL_YEAR   = "font-weight: bold; background-color: #FFEB9C; color: #9C6500;"
+CSS_TOTAL_VENDOR = "font-weight: bold; background-color: #C6EFCE; color: #006100;"
+CSS_1ST          = "background-color: #C6EFCE; color: #006100;"
+CSS_2ND          = "background-color: #FFEB9C; color: #9C6500;"
+
+def style_table(
+    df,
+    total=False,
+    bold_total=False,
+    total_per_year=False,
+    vendor_total=False,
+    rank_cols=None,
+    rank_by_vendor=False,
+):
+    """
+    Hitung seluruh matrix CSS sekaligus, dipakai dengan Styler.apply(..., axis=None).
+
+    - total / bold_total : semua baris TOTAL (row_kind bukan ROW_DETAIL)
+    - total_per_year     : TOTAL row per year (ROW_YEAR_TOTAL)
+    - vendor_total       : TOTAL row vendor (ROW_VENDOR_TOTAL)
+    - rank_cols          : 1st & 2nd lowest di antara kolom numeric tsb
+    - rank_by_vendor     : highlight kolom yang namanya ada di "1st Vendor" / "2nd Vendor"
+
+    Matrix CSS mengikuti kolom tampilan (tanpa kolom ROW_KIND).
+    """
+    kind = row_kind(df)
+    df = drop_row_kind(df)
+    n_rows, n_cols = df.shape
+    css = np.full((n_rows, n_cols), "", dtype=object)
+
+    def add(row_mask, style):
+        css[row_mask] += style
+
+    if total or bold_total:
+        is_total = kind != ROW_DETAIL
+        if total:
+            add(is_total, CSS_TOTAL)
+        if bold_total:
+            add(is_total, CSS_BOLD)
+
+    if total_per_year:
+        add(kind == ROW_YEAR_TOTAL, CSS_TOTAL_YEAR)
+
+    if vendor_total:
+        add(kind == ROW_VENDOR_TOTAL, CSS_TOTAL_VENDOR)
+
+    if rank_cols is not None and n_rows:
+        col_pos = np.array([df.columns.get_loc(c) for c in rank_cols])
+        first, second, _, _ = rank_two_lowest(df[rank_cols].to_numpy(dtype=float))
+        rows = np.arange(n_rows)
+        has_1st, has_2nd = first >= 0, second >= 0
+        css[rows[has_1st], col_pos[first[has_1st]]] += CSS_1ST
+        css[rows[has_2nd], col_pos[second[has_2nd]]] += CSS_2ND
+
+    if rank_by_vendor:
+        first  = df["1st Vendor"].to_numpy() if "1st Vendor" in df.columns else np.full(n_rows, None)
+        second = df["2nd Vendor"].to_numpy() if "2nd Vendor" in df.columns else np.full(n_rows, None)
+        for c, col in enumerate(df.columns):
+            is_first = first == col
+            css[is_first, c] += CSS_1ST
+            css[~is_first & (second == col), c] += CSS_2ND
+
+    return pd.DataFrame(css, index=df.index, columns=df.columns)
+
+# ================= PAGING =================
+# Filter, sort & halaman untuk tabel besar yang ditampilkan per halaman;
+# semuanya bekerja dengan posisi baris (np.ndarray), DataFrame tidak di-copy.
+def filter_rows(df, filters):
+    """Posisi baris df yang lolos semua filter {kolom: nilai terpilih}; list kosong = semua nilai."""
+    mask = np.ones(len(df), dtype=bool)
+    for col, chosen in filters.items():
+        if chosen:
+            mask &= df[col].isin(chosen).to_numpy()
+    return np.flatnonzero(mask)
+
+def _sort_keys(values):
+    # Categorical → peringkat nilai kategorinya (urutan teks, bukan urutan kemunculan
+    # di codes); kolom object campuran → teks
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories.astype(str)
+        rank = np.empty(len(categories) + 1, dtype=np.int64)
+        rank[np.argsort(categories, kind="stable")] = np.arange(len(categories))
+        rank[-1] = len(categories)
+        return rank[values.cat.codes.to_numpy()]
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy()
+    return values.astype(str).to_numpy()
+
+def sort_rows(df, rows, sort_col=None, descending=False):
+    """
+    Urutkan posisi baris `rows` menurut kolom sort_col (None = urutan asli).
+    Stable ke dua arah (nilai sama tetap urutan asli) dan NaN selalu di akhir.
+    """
+    if sort_col is None:
+        return rows[::-1] if descending else rows
+    values = df[sort_col].iloc[rows]
+    keys = _sort_keys(values)
+    missing = values.isna().to_numpy()
+    valid = rows[~missing]
+    keys = keys[~missing]
+    if descending:
+        # Stable descending: argsort dari urutan terbalik, lalu dibalik lagi
+        order = len(keys) - 1 - np.argsort(keys[::-1], kind="stable")[::-1]
+    else:
+        order = np.argsort(keys, kind="stable")
+    return np.concatenate([valid[order], rows[missing]])
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+def clamp_page(page, n_rows, page_size):
+    """Halaman aktif dibatasi ke 1..page_count (filter baru bisa mengurangi jumlah halaman)."""
+    return min(max(int(page), 1), page_count(n_rows, page_size))
@@ -0,0 +1,176 @@
+"""
+Cache on-disk untuk hasil parse + merge workbook tender (Merge Data).
+
+Parsing .xlsx lewat openpyxl adalah langkah paling lambat, padahal file yang
+sama sering dibuka berkali-kali. Hasil merge_vendor_workbook disimpan sebagai
+file Arrow IPC (Feather v2, tanpa kompresi) dengan key hash isi file, jadi
+upload ulang file yang sama langsung dibaca dari disk lewat memory map tanpa
+menyentuh Excel sama sekali. Categorical dan kolom ROW_KIND tersimpan sebagai
+kolom Arrow biasa, table_ranges (df.attrs) di metadata pandas-nya.
+
+Key juga memuat signature kode pipeline (hash source pipeline.py dan modul ini,
+plus versi pandas / openpyxl / pyarrow), jadi perubahan parser atau merge
+otomatis memakai entry cache baru; entry lama hilang lewat eviction.
+
+Ukuran folder cache dibatasi (TCO_CACHE_MAX_MB, default 512 MiB); kalau lewat,
+file yang paling lama tidak dipakai dihapus duluan (LRU berdasarkan mtime,
+yang di-update setiap cache hit). Lokasi folder: env TCO_CACHE_DIR.
+
+pyarrow opsional: kalau tidak ter-install, atau DataFrame-nya tidak bisa
+dikonversi ke Arrow, cache dilewati dan workbook di-parse seperti biasa.
+"""
+import hashlib
+import os
+import tempfile
+
+import openpyxl
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pyarrow opsional
+    pa = None
+
+import pipeline
+from instrumentation import perf_stage
+
+CACHE_DIR = os.environ.get("TCO_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "tco_tender")
+CACHE_MAX_BYTES = int(float(os.environ.get("TCO_CACHE_MAX_MB", "512")) * 2**20)
+SUFFIX = ".arrow"
+
+def pipeline_signature():
+    """
+    Hash kode yang menghasilkan & menyimpan Merge Data (pipeline.py + modul ini)
+    dan versi library yang ikut menentukan hasilnya.
+    """
+    h = hashlib.sha256()
+    for path in (pipeline.__file__, __file__):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    for lib in (pd, openpyxl, pa):
+        if lib is not None:
+            h.update(f"{lib.__name__}={lib.__version__}\0".encode())
+    return h.hexdigest()
+
+PIPELINE_SIGNATURE = pipeline_signature()
+
+def is_available():
+    return pa is not None and CACHE_MAX_BYTES > 0
+
+def file_key(data):
+    """
+    Key cache dari isi file (bytes), bukan nama file: upload ulang dengan nama
+    lain tetap hit. Signature pipeline ikut di-hash, jadi deploy dengan parser /
+    merge yang berubah tidak membaca hasil lama.
+    """
+    h = hashlib.sha256(data)
+    h.update(PIPELINE_SIGNATURE.encode())
+    return h.hexdigest()
+
+def _path(key, cache_dir):
+    return os.path.join(cache_dir, key + SUFFIX)
+
+def _settings(cache_dir, max_bytes):
+    # Default dibaca saat dipanggil (bukan saat def), jadi CACHE_DIR / CACHE_MAX_BYTES bisa diganti
+    return (CACHE_DIR if cache_dir is None else cache_dir,
+            CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+
+def load(key, cache_dir=None):
+    """DataFrame dari cache (memory-mapped), atau None kalau belum ada / rusak."""
+    if not is_available():
+        return None
+    cache_dir, _ = _settings(cache_dir, None)
+    path = _path(key, cache_dir)
+    try:
+        # Buffer kolom numerik menunjuk langsung ke file yang di-map; mapping-nya
+        # tetap hidup selama masih dipakai DataFrame walau file handle sudah ditutup
+        with pa.memory_map(path) as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+    except FileNotFoundError:
+        return None
+    except (OSError, pa.ArrowException):
+        # File terpotong / format lama → buang, nanti ditulis ulang
+        _remove(path)
+        return None
+    # Tandai baru dipakai untuk urutan LRU
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+def store(key, df, cache_dir=None, max_bytes=None):
+    """Simpan df ke cache lalu jalankan eviction. Return False kalau df tidak bisa disimpan."""
+    if not is_available():
+        return False
+    cache_dir, max_bytes = _settings(cache_dir, max_bytes)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        # Misal kolom object berisi campuran angka & teks
+        return False
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Tulis ke temp file lalu rename: session lain tidak pernah membaca file setengah jadi
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, _path(key, cache_dir))
+        except BaseException:
+            _remove(tmp)
+            raise
+    except OSError:
+        # Folder read-only / disk penuh: cache cuma optimasi, jangan gagalkan app
+        return False
+
+    evict(cache_dir, max_bytes)
+    return True
+
+def evict(cache_dir=None, max_bytes=None):
+    """Hapus file cache yang paling lama tidak dipakai sampai total ukuran <= max_bytes."""
+    cache_dir, max_bytes = _settings(cache_dir, max_bytes)
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+
+    total = 0
+    for _, size, path in sorted(entries, reverse=True):
+        total += size
+        if total > max_bytes:
+            _remove(path)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def cached_merge(data, build, cache_dir=None, max_bytes=None):
+    """
+    Merge Data untuk workbook `data` (bytes): dari cache kalau ada, kalau tidak
+    build() dijalankan (parse Excel) dan hasilnya disimpan.
+    """
+    if not is_available():
+        return build()
+    key = file_key(data)
+    with perf_stage("tender_cache") as record:
+        df = load(key, cache_dir)
+        record["hit"] = df is not None
+        if df is not None:
+            record["rows"] = len(df)
+    if df is None:
+        df = build()
+        store(key, df, cache_dir, max_bytes)
+    return df
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+import tender_cache
+from pipeline import (
+    build_bid_analysis,
+    build_tco_cube,
+    melt_cost_summary,
+    merge_vendor_workbook,
+    tco_summary,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DUMMY_DATASET = os.path.join(ROOT, "dummy dataset.xlsx")
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Cache Arrow tender_cache diarahkan ke tmp_path, tidak pernah ke ~/.cache."""
+    cache_dir = tmp_path / "tco_tender"
+    monkeypatch.setenv("TCO_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(tender_cache, "CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+@pytest.fixture(scope="session")
+def dataframes():
+    """Enam tabel Super Button dari dummy dataset, dibangun langsung lewat pipeline."""
+    df_merge = merge_vendor_workbook(DUMMY_DATASET)
+    df_summary = melt_cost_summary(df_merge)
+    tco_cube = build_tco_cube(df_summary)
+    return {
+        "Merge Data": df_merge,
+        "Cost Summary": df_summary,
+        "TCO Summary (Year)": tco_summary(tco_cube, "YEAR"),
+        "TCO Summary (Region)": tco_summary(tco_cube, "REGION"),
+        "TCO Summary (Scope)": tco_summary(tco_cube, "SCOPE"),
+        "Bid & Price Analysis": build_bid_analysis(tco_cube),
+    }
@@ -0,0 +1,29 @@
+import re
+import zipfile
+from io import BytesIO
+
+from xlsxwriter.workbook import Workbook
+
+from excel_export import EXPORT_FORMATS, generate_multi_sheet_excel
+
+def test_six_sheet_export_shares_formats(dataframes, monkeypatch):
+    assert len(dataframes) == 6
+    specs = [spec for spec in EXPORT_FORMATS if spec]
+
+    calls = []
+    add_format = Workbook.add_format
+
+    def counting_add_format(self, properties=None):
+        calls.append(properties)
+        return add_format(self, properties)
+
+    monkeypatch.setattr(Workbook, "add_format", counting_add_format)
+    output = generate_multi_sheet_excel(list(dataframes), dataframes)
+
+    # Setiap format export dibuat sekali per workbook, bukan sekali per sheet
+    assert len([p for p in calls if p in specs]) == len(specs)
+
+    styles = zipfile.ZipFile(BytesIO(output)).read("xl/styles.xml").decode()
+    n_xfs = int(re.search(r'<cellXfs count="(\d+)"', styles).group(1))
+    # Default style + format header pandas + format export
+    assert n_xfs == len(specs) + 2
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from pipeline import default_ingest_workers, load_vendor_sheets
+from test_parsing import HEADER, make_workbook
+
+@pytest.mark.parametrize("value, expected", [(None, 1), ("", 1), ("4", 4), (" 2 ", 2), ("0", 1)])
+def test_ingest_workers_env(monkeypatch, value, expected):
+    if value is None:
+        monkeypatch.delenv("TCO_INGEST_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("TCO_INGEST_WORKERS", value)
+    assert default_ingest_workers() == expected
+
+def test_malformed_ingest_workers_falls_back_to_serial(monkeypatch):
+    monkeypatch.setenv("TCO_INGEST_WORKERS", "auto")
+    with pytest.warns(UserWarning, match="TCO_INGEST_WORKERS"):
+        assert default_ingest_workers() == 1
+
+def test_pool_matches_serial():
+    data = make_workbook({
+        f"Vendor {i}": [HEADER, (2025, "Scope A", 1000 + i, 2000), (2026, "Scope B", 1500, 2500 + i)]
+        for i in range(4)
+    })
+    serial = load_vendor_sheets(data, workers=1)
+    pooled = load_vendor_sheets(data, workers=2, min_sheets=1)
+
+    assert [name for name, _ in pooled] == [name for name, _ in serial]
+    for (_, a), (_, b) in zip(serial, pooled):
+        pd.testing.assert_frame_equal(a, b)
+        assert a.attrs == b.attrs
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+import pipeline
+from pipeline import merge_vendor_workbook
+from test_parsing import HEADER, make_workbook
+
+VENDOR_A = [HEADER, (2025, "Scope A", 1000, 2000), (2025, "Scope B", 1500, 2500)]
+
+@pytest.mark.parametrize("cache", [None, {}])
+def test_sheet_with_different_columns_is_named(cache):
+    data = make_workbook({
+        "Vendor A": VENDOR_A,
+        "Vendor B": [("Year", "Scope", "Region 1", "Region 3"), (2025, "Scope A", 1100, 2100)],
+    })
+    with pytest.raises(ValueError, match="Sheet 'Vendor B': columns .* do not match sheet 'Vendor A'"):
+        merge_vendor_workbook(data, cache=cache)
+
+@pytest.mark.parametrize("cache", [None, {}])
+def test_region_column_read_as_text_is_named(cache):
+    # Semua harga REGION 1 di Vendor B bukan angka → kolomnya jadi teks di sheet itu saja
+    data = make_workbook({
+        "Vendor A": VENDOR_A,
+        "Vendor B": [HEADER, (2025, "Scope A", "TBD", 2100), (2025, "Scope B", "TBD", 2600)],
+    })
+    with pytest.raises(ValueError, match="Sheet 'Vendor B': region columns"):
+        merge_vendor_workbook(data, cache=cache)
+
+@pytest.mark.parametrize("cache", [None, {}])
+def test_sheet_without_prices_is_named(cache):
+    data = make_workbook({
+        "Vendor A": VENDOR_A,
+        "Vendor B": [("Year", "Scope", "Notes"), (2025, "Scope A", "no bid")],
+    })
+    with pytest.raises(ValueError, match="Sheet 'Vendor B': no numeric region columns"):
+        merge_vendor_workbook(data, cache=cache)
+
+    data = make_workbook({
+        "Vendor A": VENDOR_A,
+        "Vendor B": [HEADER, (2025, "Scope A", 1100, None), (2025, "Scope B", 1600, None)],
+    })
+    with pytest.raises(ValueError, match=r"Sheet 'Vendor B': region column\(s\) REGION 2 contain no prices"):
+        merge_vendor_workbook(data, cache=cache)
+
+@pytest.mark.parametrize("cache", [None, {}])
+def test_workbook_without_tables(cache):
+    data = make_workbook({"Vendor A": [], "Vendor B": [(None, None)]})
+    with pytest.raises(ValueError, match="No vendor table found"):
+        merge_vendor_workbook(data, cache=cache)
+
+def _remerge(before, after, monkeypatch):
+    # Merge `before` dengan cache, lalu `after` memakai cache yang sama.
+    # Return (hasil incremental, hasil parse baru, sheet yang di-parse ulang)
+    cache = {}
+    merge_vendor_workbook(make_workbook(before), cache=cache)
+
+    parsed = []
+    load = pipeline.load_vendor_sheets
+
+    def recording_load(source, workers=None, sheet_names=None, **kwargs):
+        parsed.extend(sheet_names)
+        return load(source, workers=workers, sheet_names=sheet_names, **kwargs)
+
+    monkeypatch.setattr(pipeline, "load_vendor_sheets", recording_load)
+    data = make_workbook(after)
+    return merge_vendor_workbook(data, cache=cache), merge_vendor_workbook(data), parsed
+
+VENDOR_B = [HEADER, (2025, "Scope A", 1100, 2100), (2025, "Scope B", 1600, 2600)]
+VENDOR_C = [HEADER, (2025, "Scope A", 900, 1900), (2026, "Scope B", 1400, 2400)]
+
+@pytest.mark.parametrize("after, reparsed", [
+    # Satu sheet berubah
+    ({"Vendor A": VENDOR_A, "Vendor B": VENDOR_B[:2] + [(2025, "Scope B", 1700, 2600)], "Vendor C": VENDOR_C},
+     ["Vendor B"]),
+    # Satu sheet di-rename
+    ({"Vendor A": VENDOR_A, "Vendor X": VENDOR_B, "Vendor C": VENDOR_C}, ["Vendor X"]),
+    # Dua sheet dengan isi identik
+    ({"Vendor A": VENDOR_A, "Vendor B": VENDOR_B, "Vendor C": VENDOR_C, "Vendor D": VENDOR_B}, ["Vendor D"]),
+    # Satu sheet dihapus
+    ({"Vendor A": VENDOR_A, "Vendor C": VENDOR_C}, []),
+])
+def test_incremental_merge_matches_fresh_parse(monkeypatch, after, reparsed):
+    before = {"Vendor A": VENDOR_A, "Vendor B": VENDOR_B, "Vendor C": VENDOR_C}
+    incremental, fresh, parsed = _remerge(before, after, monkeypatch)
+
+    assert parsed == reparsed
+    pd.testing.assert_frame_equal(incremental, fresh)
+    assert incremental.attrs == fresh.attrs
+    assert list(pd.unique(incremental["VENDOR"])) == list(after)
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from table_style import clamp_page, filter_rows, page_count, sort_rows
+
+def _frame():
+    # Kategori sengaja tidak urut abjad (urutan kemunculan), plus satu NaN
+    scope = pd.Categorical(
+        ["Site", "Dismantle", None, "Power", "Dismantle", "Site"],
+        categories=["Site", "Dismantle", "Power"],
+    )
+    return pd.DataFrame({
+        "VENDOR": pd.Categorical(["A", "A", "B", "B", "C", "C"]),
+        "SCOPE": scope,
+        "PRICE": [300.0, 100.0, 200.0, np.nan, 100.0, 50.0],
+    })
+
+def test_categorical_sorts_by_value_with_nan_last():
+    df = _frame()
+    rows = np.arange(len(df))
+
+    asc = sort_rows(df, rows, "SCOPE")
+    assert df["SCOPE"].iloc[asc].tolist()[:-1] == ["Dismantle", "Dismantle", "Power", "Site", "Site"]
+    assert asc[-1] == 2
+
+    desc = sort_rows(df, rows, "SCOPE", descending=True)
+    assert df["SCOPE"].iloc[desc].tolist()[:-1] == ["Site", "Site", "Power", "Dismantle", "Dismantle"]
+    assert desc[-1] == 2
+
+def test_numeric_sort_is_stable_both_ways():
+    df = _frame()
+    rows = np.arange(len(df))
+
+    # Nilai sama (100.0 di baris 1 & 4) tetap urutan asli di kedua arah, NaN di akhir
+    np.testing.assert_array_equal(sort_rows(df, rows, "PRICE"), [5, 1, 4, 2, 0, 3])
+    np.testing.assert_array_equal(sort_rows(df, rows, "PRICE", descending=True), [0, 2, 1, 4, 5, 3])
+    np.testing.assert_array_equal(sort_rows(df, rows), rows)
+    np.testing.assert_array_equal(sort_rows(df, rows, descending=True), rows[::-1])
+
+def test_sort_after_filter_keeps_row_positions():
+    df = _frame()
+    rows = filter_rows(df, {"VENDOR": ["B", "C"], "SCOPE": []})
+    np.testing.assert_array_equal(rows, [2, 3, 4, 5])
+    np.testing.assert_array_equal(sort_rows(df, rows, "PRICE"), [5, 4, 2, 3])
+
+def test_page_is_clamped_after_filter():
+    df = pd.DataFrame({"VENDOR": pd.Categorical(["A"] * 250 + ["B"] * 30)})
+    page_size = 100
+    assert page_count(len(df), page_size) == 3
+
+    # User di halaman 3, lalu filter VENDOR = B menyisakan 30 baris (1 halaman)
+    rows = filter_rows(df, {"VENDOR": ["B"]})
+    assert clamp_page(3, len(rows), page_size) == 1
+    assert clamp_page(2, len(filter_rows(df, {"VENDOR": ["A"]})), page_size) == 2
+
+    # Filter tanpa hasil tetap punya satu halaman (kosong)
+    rows = filter_rows(df, {"VENDOR": ["C"]})
+    assert page_count(len(rows), page_size) == 1
+    assert clamp_page(3, len(rows), page_size) == 1
+    assert clamp_page(0, len(rows), page_size) == 1
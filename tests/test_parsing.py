@@ -0,0 +1,64 @@
+from io import BytesIO
+
+import numpy as np
+from openpyxl import Workbook
+
+from pipeline import merge_vendor_workbook, parse_vendor_rows
+
+HEADER = ("Year", "Scope", "Region 1", "Region 2")
+
+def make_workbook(sheets):
+    wb = Workbook()
+    wb.remove(wb.active)
+    for name, rows in sheets.items():
+        ws = wb.create_sheet(name)
+        for row in rows:
+            ws.append(row)
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+def test_non_numeric_price_becomes_nan_and_is_reported():
+    rows = [
+        (None, None, None, None, None),
+        (None, *HEADER),
+        (None, 2025, "Scope A", 1000, "N/A"),
+        (None, 2025, "Scope B", "1.500", 2000),
+        (None, 2026, "Scope A", 1100, 2100),
+    ]
+    df = parse_vendor_rows(rows)
+
+    assert list(df.columns) == ["YEAR", "SCOPE", "REGION 1", "REGION 2"]
+    assert df["REGION 1"].dtype.kind == "i"
+    assert df["REGION 2"].dtype.kind == "f"
+    assert np.isnan(df["REGION 2"].iloc[0])
+    assert df["REGION 2"].iloc[1:].tolist() == [2000, 2100]
+    assert df.attrs["invalid_cells"] == {"E3": "N/A"}
+    assert df.attrs["table_range"] == "B2:E5"
+
+def test_mostly_text_column_stays_text():
+    rows = [
+        ("Year", "Scope", "Notes", "Region 1"),
+        (2025, "Scope A", "-", 1000),
+        (2025, "Scope B", "incl. VAT", 2000),
+        (2026, "Scope C", 12, 3000),
+    ]
+    df = parse_vendor_rows(rows)
+
+    assert df["NOTES"].tolist() == ["-", "incl. VAT", "12"]
+    assert df["REGION 1"].tolist() == [1000, 2000, 3000]
+    assert "invalid_cells" not in df.attrs
+
+def test_merge_reports_invalid_cells_per_sheet():
+    data = make_workbook({
+        "Vendor A": [HEADER, (2025, "Scope A", 1000, 2000), (2025, "Scope B", 1500, 2500)],
+        "Vendor B": [HEADER, (2025, "Scope A", "TBD", 2100), (2025, "Scope B", 1600, 2600)],
+    })
+    for cache in (None, {}):
+        df_merge = merge_vendor_workbook(data, cache=cache)
+
+        assert df_merge.attrs["invalid_cells"] == {"Vendor B": {"C2": "TBD"}}
+        assert df_merge["REGION 1"].dtype.kind == "f"
+        detail = df_merge[(df_merge["VENDOR"] == "Vendor B") & (df_merge["SCOPE"] == "Scope A")]
+        assert np.isnan(detail["REGION 1"].iloc[0])
+        assert detail["TOTAL"].iloc[0] == 2100
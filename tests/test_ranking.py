@@ -0,0 +1,50 @@
+import numpy as np
+
+from pipeline import rank_two_lowest
+
+def test_zero_and_nan_are_not_bids():
+    values = np.array([
+        [0.0, np.nan, 300.0, 200.0],
+        [np.nan, 50.0, 0.0, 70.0],
+    ])
+    first, second, first_val, second_val = rank_two_lowest(values)
+
+    np.testing.assert_array_equal(first, [3, 1])
+    np.testing.assert_array_equal(second, [2, 3])
+    np.testing.assert_array_equal(first_val, [200.0, 50.0])
+    np.testing.assert_array_equal(second_val, [300.0, 70.0])
+
+def test_single_bidder_has_no_second():
+    first, second, first_val, second_val = rank_two_lowest([[0.0, 120.0, np.nan]])
+
+    np.testing.assert_array_equal(first, [1])
+    np.testing.assert_array_equal(second, [-1])
+    np.testing.assert_array_equal(first_val, [120.0])
+    assert np.isnan(second_val).all()
+
+def test_rows_without_bids():
+    first, second, first_val, second_val = rank_two_lowest([[0.0, np.nan], [np.nan, np.nan]])
+
+    np.testing.assert_array_equal(first, [-1, -1])
+    np.testing.assert_array_equal(second, [-1, -1])
+    assert np.isnan(first_val).all() and np.isnan(second_val).all()
+
+    # Tanpa baris / tanpa kolom vendor sama sekali
+    first, second, first_val, _ = rank_two_lowest(np.empty((3, 0)))
+    np.testing.assert_array_equal(first, [-1, -1, -1])
+    np.testing.assert_array_equal(second, [-1, -1, -1])
+    assert np.isnan(first_val).all()
+    assert all(len(a) == 0 for a in rank_two_lowest(np.empty((0, 4))))
+
+def test_ties_go_to_leftmost_vendor():
+    values = np.array([
+        [100.0, 100.0, 100.0],  # seri tiga vendor
+        [300.0, 200.0, 200.0],  # seri di posisi pertama
+        [100.0, 300.0, 300.0],  # seri di posisi kedua
+    ])
+    first, second, first_val, second_val = rank_two_lowest(values)
+
+    np.testing.assert_array_equal(first, [0, 1, 0])
+    np.testing.assert_array_equal(second, [1, 2, 1])
+    np.testing.assert_array_equal(first_val, [100.0, 200.0, 100.0])
+    np.testing.assert_array_equal(second_val, [100.0, 200.0, 300.0])
@@ -0,0 +1,46 @@
+import numpy as np
+
+from excel_export import FMT_BOLD, FMT_TOTAL_VENDOR, FMT_TOTAL_YEAR, build_format_codes
+from table_style import CSS_BOLD, CSS_TOTAL_VENDOR, CSS_TOTAL_YEAR, style_table
+
+def _rows_with(matrix, value):
+    # Baris yang minimal satu cell-nya mengandung `value`
+    matrix = np.asarray(matrix)
+    if matrix.dtype == object:
+        return np.flatnonzero([any(value in str(x) for x in row) for row in matrix])
+    return np.flatnonzero((matrix == value).any(axis=1))
+
+def _reordered(df):
+    # Urutan baru yang mencampur baris detail & TOTAL (sort harga turun, lalu acak)
+    df = df.sort_values(df.columns[-2], ascending=False, kind="stable")
+    return df.iloc[np.random.default_rng(0).permutation(len(df))]
+
+def test_merge_totals_follow_their_rows(dataframes):
+    for sheet in ["Merge Data", "Cost Summary"]:
+        df = _reordered(dataframes[sheet])
+        # Jenis baris yang diharapkan dibaca dari label, bukan dari ROW_KIND
+        vendor_total = np.flatnonzero(df["YEAR"].astype(str).to_numpy() == "TOTAL")
+        year_total = np.flatnonzero(df["SCOPE"].astype(str).to_numpy() == "TOTAL")
+        assert len(vendor_total) and len(year_total)
+
+        css = style_table(df, total_per_year=True, vendor_total=True).to_numpy()
+        np.testing.assert_array_equal(_rows_with(css, CSS_TOTAL_YEAR), year_total)
+        np.testing.assert_array_equal(_rows_with(css, CSS_TOTAL_VENDOR), vendor_total)
+        assert not css[np.setdiff1d(np.arange(len(df)), np.union1d(year_total, vendor_total))].any()
+
+        codes = build_format_codes(sheet, df)
+        np.testing.assert_array_equal(_rows_with(codes, FMT_TOTAL_YEAR), year_total)
+        np.testing.assert_array_equal(_rows_with(codes, FMT_TOTAL_VENDOR), vendor_total)
+
+def test_tco_totals_follow_their_rows(dataframes):
+    for sheet in ["TCO Summary (Year)", "TCO Summary (Region)", "TCO Summary (Scope)"]:
+        df = _reordered(dataframes[sheet])
+        total = np.flatnonzero(df.iloc[:, 0].astype(str).to_numpy() == "TOTAL")
+        assert len(total) == 1
+
+        css = style_table(df, bold_total=True).to_numpy()
+        np.testing.assert_array_equal(_rows_with(css, CSS_BOLD), total)
+
+        # Cell TOTAL tanpa highlight ranking → bold biasa
+        codes = build_format_codes(sheet, df)
+        np.testing.assert_array_equal(_rows_with(codes[:, :1], FMT_BOLD), total)
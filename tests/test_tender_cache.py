@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+import tender_cache
+from pipeline import ROW_KIND_COL
+
+pytest.importorskip("pyarrow")
+
+def test_round_trip_keeps_dtypes_and_attrs(dataframes, isolated_cache):
+    df = dataframes["Merge Data"]
+    assert tender_cache.store("merge", df)
+    assert os.listdir(isolated_cache) == ["merge" + tender_cache.SUFFIX]
+
+    loaded = tender_cache.load("merge")
+    pd.testing.assert_frame_equal(loaded, df)
+    for col in ["VENDOR", "YEAR", "SCOPE"]:
+        assert isinstance(loaded[col].dtype, pd.CategoricalDtype)
+        assert loaded[col].cat.categories.tolist() == df[col].cat.categories.tolist()
+    assert loaded[ROW_KIND_COL].dtype == df[ROW_KIND_COL].dtype
+    assert loaded.attrs["table_ranges"] == df.attrs["table_ranges"]
+
+def test_corrupt_file_is_dropped(dataframes, isolated_cache):
+    tender_cache.store("merge", dataframes["Merge Data"])
+    path = isolated_cache / ("merge" + tender_cache.SUFFIX)
+    path.write_bytes(path.read_bytes()[:100])
+
+    assert tender_cache.load("merge") is None
+    assert not path.exists()
+
+def test_eviction_drops_least_recently_used(isolated_cache):
+    df = pd.DataFrame({"PRICE": range(1000)})
+    for i, key in enumerate(["a", "b", "c"]):
+        tender_cache.store(key, df)
+        os.utime(isolated_cache / (key + tender_cache.SUFFIX), (1_000 + i, 1_000 + i))
+
+    # Hit pada "a" menjadikannya yang paling baru dipakai
+    assert tender_cache.load("a") is not None
+    size = os.path.getsize(isolated_cache / ("a" + tender_cache.SUFFIX))
+    tender_cache.evict(max_bytes=2 * size)
+
+    assert sorted(os.listdir(isolated_cache)) == ["a" + tender_cache.SUFFIX, "c" + tender_cache.SUFFIX]
+
+def test_key_follows_pipeline_signature(monkeypatch):
+    data = b"workbook bytes"
+    key = tender_cache.file_key(data)
+    assert tender_cache.file_key(data) == key
+
+    monkeypatch.setattr(tender_cache, "PIPELINE_SIGNATURE", "other pipeline")
+    assert tender_cache.file_key(data) != key
+
+def test_cached_merge_rebuilds_after_signature_change(monkeypatch):
+    df = pd.DataFrame({"PRICE": [1.0, 2.0]})
+    builds = []
+
+    def build():
+        builds.append(1)
+        return df
+
+    tender_cache.cached_merge(b"data", build)
+    tender_cache.cached_merge(b"data", build)
+    assert len(builds) == 1
+
+    monkeypatch.setattr(tender_cache, "PIPELINE_SIGNATURE", "other pipeline")
+    pd.testing.assert_frame_equal(tender_cache.cached_merge(b"data", build), df)
+    assert len(builds) == 2